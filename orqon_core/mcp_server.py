@@ -1534,6 +1534,9 @@ class ExcelAgent(BaseAgent):
             else:
                 file_path = None
             
+            if file_path is not None and file_path.suffix == ".xlsx":
+                await asyncio.to_thread(_refresh_trade_blotter_excel)
+            
             if file_path and file_path.exists():
                 try:
                     # Open file with system default application
@@ -3007,6 +3010,17 @@ async def astra_search_api(query: str, search_type: str = "all", limit: int = 5)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _refresh_trade_blotter_excel():
+    """Re-export trade_blotter.xlsx from the trade store so a stale workbook is never served"""
+    try:
+        from tools.trade_data_tools import refresh_trade_blotter_excel
+        result = refresh_trade_blotter_excel()
+        if result:
+            logger.info(result)
+    except Exception as e:
+        logger.warning(f"Could not refresh trade blotter Excel export: {str(e)}")
+
+
 @app.get("/download/csv")
 async def download_csv():
     """
@@ -3036,6 +3050,7 @@ async def download_excel():
     from fastapi.responses import FileResponse
     
     excel_path = Path(__file__).parent / "data" / "trade_blotter.xlsx"
+    await asyncio.to_thread(_refresh_trade_blotter_excel)
     
     if not excel_path.exists():
         raise HTTPException(status_code=404, detail="Excel file not found")
@@ -3047,6 +3062,26 @@ async def download_excel():
     )
 
 
+@app.get("/trade-chart")
+async def trade_chart(chart_type: str = "all"):
+    """
+    Trade analytics chart as a PNG image
+    """
+    from fastapi.responses import Response
+    from tools.trade_data_tools import generate_trade_chart_png
+    
+    try:
+        png = await asyncio.to_thread(generate_trade_chart_png, chart_type)
+    except Exception as e:
+        logger.error(f"Failed to generate trade chart: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate trade chart: {str(e)}")
+    
+    if png is None:
+        raise HTTPException(status_code=404, detail="No trades available for chart generation")
+    
+    return Response(content=png, media_type="image/png")
+
+
 @app.get("/get-csv-data")
 async def get_csv_data():
     """
@@ -3119,6 +3154,7 @@ async def open_excel_file():
     import platform
     
     file_path = Path(__file__).parent / "data" / "trade_blotter.xlsx"
+    await asyncio.to_thread(_refresh_trade_blotter_excel)
     
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="Excel file not found")
@@ -3157,6 +3193,7 @@ async def open_file(request: Dict[str, Any]):
         file_path = Path(__file__).parent / "data" / "trade_blotter.csv"
     elif file_type in ["excel", "xlsx"]:
         file_path = Path(__file__).parent / "data" / "trade_blotter.xlsx"
+        await asyncio.to_thread(_refresh_trade_blotter_excel)
     else:
         raise HTTPException(status_code=400, detail="Invalid file type. Use 'csv' or 'excel'")
     
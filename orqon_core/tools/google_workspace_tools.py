@@ -2,8 +2,12 @@
 Google Workspace Tools (Gmail, Calendar, Meet)
 Integration with Google Cloud APIs
 """
+import asyncio
+import io
+import mmap
 import os
-import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict
 from pathlib import Path
@@ -12,12 +16,27 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseUpload
+from googleapiclient.model import JsonModel
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
-from email import encoders
 import base64
 
+# Optional: SIMD base64 codec for attachments and raw messages
+try:
+    import pybase64
+    HAS_PYBASE64 = True
+except ImportError:
+    HAS_PYBASE64 = False
+
+# Optional: faster JSON for API request/response bodies
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Scopes
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.send',
@@ -28,7 +47,65 @@ SCOPES = [
 # Paths
 DATA_DIR = Path(__file__).parent.parent / "data"
 CREDENTIALS_FILE = DATA_DIR / "google_credentials.json"
-TOKEN_FILE = DATA_DIR / "google_token.pickle"
+TOKEN_FILE = DATA_DIR / "google_token.json"
+
+# Refresh tokens in the background once they are this close to expiring
+TOKEN_REFRESH_MARGIN = timedelta(minutes=10)
+
+# Cap on concurrent Gmail sends for bulk workflows
+MAX_CONCURRENT_SENDS = 8
+
+# Calendar paging and batch sizes (the batch endpoint accepts up to 50 calls)
+CALENDAR_PAGE_SIZE = 250
+CALENDAR_BATCH_SIZE = 50
+
+# Messages larger than this are sent through Gmail's resumable upload endpoint
+UPLOAD_THRESHOLD_BYTES = 5 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Attachment MIME types by lowercase file extension
+ATTACHMENT_MIME_TYPES = {
+    '.docx': ('application', 'vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    '.xlsx': ('application', 'vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    '.pptx': ('application', 'vnd.openxmlformats-officedocument.presentationml.presentation'),
+    '.csv': ('text', 'csv'),
+    '.pdf': ('application', 'pdf'),
+}
+DEFAULT_MIME_TYPE = ('application', 'octet-stream')
+
+
+def _encode_attachment(attachment_path: str) -> str:
+    """Base64-encode a file for a MIME part straight from an mmap of it"""
+    with open(attachment_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if HAS_PYBASE64:
+                return pybase64.encodebytes(mm).decode('ascii')
+            return base64.encodebytes(mm).decode('ascii')
+
+
+class OrjsonModel(JsonModel):
+    """JsonModel that parses and serializes API bodies with orjson"""
+    
+    def serialize(self, body_value):
+        if isinstance(body_value, dict) and "data" not in body_value and self._data_wrapper:
+            body_value = {"data": body_value}
+        return orjson.dumps(body_value).decode()
+    
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return content.decode("utf-8") if isinstance(content, bytes) else content
+        if self._data_wrapper and "data" in body:
+            body = body["data"]
+        return body
+
+
+# Shared, stateless request/response model for every service we build
+API_MODEL = OrjsonModel() if HAS_ORJSON else JsonModel()
 
 
 class GoogleWorkspaceTools:
@@ -36,14 +113,14 @@ class GoogleWorkspaceTools:
     
     def __init__(self):
         self.creds = None
+        self._refresh_lock = threading.Lock()
         self._authenticate()
     
     def _authenticate(self):
         """Authenticate with Google APIs"""
         # Load token if exists
         if TOKEN_FILE.exists():
-            with open(TOKEN_FILE, 'rb') as token:
-                self.creds = pickle.load(token)
+            self.creds = Credentials.from_authorized_user_file(str(TOKEN_FILE), SCOPES)
         
         # If no valid credentials, authenticate
         if not self.creds or not self.creds.valid:
@@ -62,8 +139,48 @@ class GoogleWorkspaceTools:
                 self.creds = flow.run_local_server(port=0)
             
             # Save token
-            with open(TOKEN_FILE, 'wb') as token:
-                pickle.dump(self.creds, token)
+            self._save_token()
+        else:
+            self._schedule_refresh()
+    
+    def _save_token(self):
+        """Persist credentials atomically so a crash never leaves a torn token file"""
+        tmp_file = TOKEN_FILE.with_suffix(".json.tmp")
+        tmp_file.write_text(self.creds.to_json())
+        os.replace(tmp_file, TOKEN_FILE)
+    
+    def _schedule_refresh(self):
+        """Refresh a soon-to-expire token off the request path"""
+        expiry = self.creds.expiry
+        if not expiry or not self.creds.refresh_token:
+            return
+        
+        # google-auth stores expiry as naive UTC
+        if expiry - datetime.utcnow() < TOKEN_REFRESH_MARGIN and not self._refresh_lock.locked():
+            threading.Thread(target=self._refresh_token, daemon=True).start()
+    
+    def _refresh_token(self):
+        """Refresh and persist credentials (runs on a background thread)"""
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # Another refresh is already in flight
+        try:
+            self.creds.refresh(Request())
+            self._save_token()
+        except Exception as e:
+            print(f"Background token refresh failed: {e}")
+        finally:
+            self._refresh_lock.release()
+    
+    def _fresh_credentials(self) -> Credentials:
+        """Credentials for the next API call, refreshed first if they have expired"""
+        if self.creds.expired and self.creds.refresh_token:
+            with self._refresh_lock:
+                if self.creds.expired:
+                    self.creds.refresh(Request())
+                    self._save_token()
+        else:
+            self._schedule_refresh()
+        return self.creds
     
     def send_email(
         self,
@@ -87,7 +204,7 @@ class GoogleWorkspaceTools:
             Dict with success status and message ID
         """
         try:
-            service = build('gmail', 'v1', credentials=self.creds)
+            service = build('gmail', 'v1', credentials=self._fresh_credentials(), model=API_MODEL)
             
             message = MIMEMultipart()
             message['to'] = to_email
@@ -106,35 +223,43 @@ class GoogleWorkspaceTools:
                         filename = os.path.basename(attachment_path)
                         
                         # Determine MIME type based on file extension
-                        if filename.endswith('.docx'):
-                            maintype = 'application'
-                            subtype = 'vnd.openxmlformats-officedocument.wordprocessingml.document'
-                        elif filename.endswith('.csv'):
-                            maintype = 'text'
-                            subtype = 'csv'
-                        elif filename.endswith('.xlsx'):
-                            maintype = 'application'
-                            subtype = 'vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                        else:
-                            maintype = 'application'
-                            subtype = 'octet-stream'
+                        ext = os.path.splitext(filename)[1].lower()
+                        maintype, subtype = ATTACHMENT_MIME_TYPES.get(ext, DEFAULT_MIME_TYPE)
                         
-                        with open(attachment_path, 'rb') as f:
-                            part = MIMEBase(maintype, subtype)
-                            part.set_payload(f.read())
-                            encoders.encode_base64(part)
-                            part.add_header(
-                                'Content-Disposition',
-                                f'attachment; filename="{filename}"'
-                            )
-                            message.attach(part)
+                        part = MIMEBase(maintype, subtype)
+                        part.set_payload(_encode_attachment(attachment_path))
+                        part['Content-Transfer-Encoding'] = 'base64'
+                        part.add_header(
+                            'Content-Disposition',
+                            f'attachment; filename="{filename}"'
+                        )
+                        message.attach(part)
             
             # Encode and send
-            raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
-            result = service.users().messages().send(
-                userId='me',
-                body={'raw': raw}
-            ).execute()
+            message_bytes = message.as_bytes()
+            
+            if len(message_bytes) > UPLOAD_THRESHOLD_BYTES:
+                # Stream large messages as-is instead of base64url-encoding them into the JSON body
+                media = MediaIoBaseUpload(
+                    io.BytesIO(message_bytes),
+                    mimetype='message/rfc822',
+                    chunksize=UPLOAD_CHUNK_SIZE,
+                    resumable=True
+                )
+                result = service.users().messages().send(
+                    userId='me',
+                    body={},
+                    media_body=media
+                ).execute()
+            else:
+                if HAS_PYBASE64:
+                    raw = pybase64.urlsafe_b64encode_as_string(message_bytes)
+                else:
+                    raw = base64.urlsafe_b64encode(message_bytes).decode()
+                result = service.users().messages().send(
+                    userId='me',
+                    body={'raw': raw}
+                ).execute()
             
             attachment_count = len(attachment_paths) if attachment_paths else 0
             return {
@@ -150,6 +275,40 @@ class GoogleWorkspaceTools:
                 "message": f"Failed to send email: {error}"
             }
     
+    async def send_emails_async(self, emails: List[Dict]) -> List[Dict]:
+        """
+        Send several emails concurrently
+        
+        Args:
+            emails: List of dicts holding send_email keyword arguments
+        
+        Returns:
+            List of send_email results, in the same order as emails
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SENDS)
+        
+        async def _send(email_kwargs: Dict) -> Dict:
+            async with semaphore:
+                return await asyncio.to_thread(self.send_email, **email_kwargs)
+        
+        return await asyncio.gather(*(_send(e) for e in emails))
+    
+    def send_emails(self, emails: List[Dict]) -> List[Dict]:
+        """
+        Blocking wrapper around send_emails_async for the sync tool layer
+        
+        Async callers should prefer awaiting send_emails_async; when a sync tool
+        is called on a thread that already runs a loop, the sends run on a private
+        loop in a worker thread instead.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.send_emails_async(emails))
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.send_emails_async(emails)).result()
+    
     def create_calendar_event(
         self,
         summary: str,
@@ -174,7 +333,7 @@ class GoogleWorkspaceTools:
             Dict with success status, event link, and meet link
         """
         try:
-            service = build('calendar', 'v3', credentials=self.creds)
+            service = build('calendar', 'v3', credentials=self._fresh_credentials(), model=API_MODEL)
             
             event = {
                 'summary': summary,
@@ -274,7 +433,7 @@ class GoogleWorkspaceTools:
     def list_upcoming_events(self, max_results: int = 10) -> Dict:
         """List upcoming calendar events"""
         try:
-            service = build('calendar', 'v3', credentials=self.creds)
+            service = build('calendar', 'v3', credentials=self._fresh_credentials(), model=API_MODEL)
             
             # Get events from now onwards
             now = datetime.utcnow().isoformat() + 'Z'
@@ -305,7 +464,7 @@ class GoogleWorkspaceTools:
     def cancel_event(self, event_id: str) -> Dict:
         """Cancel/delete a specific calendar event"""
         try:
-            service = build('calendar', 'v3', credentials=self.creds)
+            service = build('calendar', 'v3', credentials=self._fresh_credentials(), model=API_MODEL)
             
             service.events().delete(
                 calendarId='primary',
@@ -324,32 +483,73 @@ class GoogleWorkspaceTools:
                 "message": f"Failed to cancel event: {error}"
             }
     
+    def _delete_events_batch(self, service, events: List[Dict]) -> List[str]:
+        """Delete events in a single batch request; returns titles of the deleted ones"""
+        deleted = {}
+        
+        def _on_delete(request_id, response, exception):
+            if exception is None:
+                index = int(request_id)
+                deleted[index] = events[index].get('summary', '')
+        
+        batch = service.new_batch_http_request(callback=_on_delete)
+        for index, event in enumerate(events):
+            batch.add(
+                service.events().delete(calendarId='primary', eventId=event['id']),
+                request_id=str(index)
+            )
+        batch.execute()
+        
+        return [deleted[index] for index in sorted(deleted)]
+    
     def cancel_all_meetings(self, filter_keyword: Optional[str] = None) -> Dict:
         """Cancel all upcoming meetings (optionally filter by keyword in title)"""
         try:
-            # Get all upcoming events
-            result = self.list_upcoming_events(max_results=50)
+            # Separate clients: httplib2 connections must not be shared across threads
+            list_service = build('calendar', 'v3', credentials=self._fresh_credentials(), model=API_MODEL)
+            delete_service = build('calendar', 'v3', credentials=self._fresh_credentials(), model=API_MODEL)
             
-            if not result['success']:
-                return result
+            now = datetime.utcnow().isoformat() + 'Z'
+            keyword = filter_keyword.lower() if filter_keyword else None
             
-            events = result['events']
-            cancelled_count = 0
-            cancelled_titles = []
+            pending = []
+            to_delete = []
+            page_token = None
             
-            for event in events:
-                title = event.get('summary', '')
-                event_id = event.get('id')
+            # Page through events on this thread while batches are deleted on the worker
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                while True:
+                    page = list_service.events().list(
+                        calendarId='primary',
+                        timeMin=now,
+                        maxResults=CALENDAR_PAGE_SIZE,
+                        singleEvents=True,
+                        orderBy='startTime',
+                        pageToken=page_token
+                    ).execute()
+                    
+                    for event in page.get('items', []):
+                        # Filter by keyword if provided
+                        if keyword and keyword not in event.get('summary', '').lower():
+                            continue
+                        
+                        to_delete.append(event)
+                        if len(to_delete) == CALENDAR_BATCH_SIZE:
+                            pending.append(executor.submit(self._delete_events_batch, delete_service, to_delete))
+                            to_delete = []
+                    
+                    page_token = page.get('nextPageToken')
+                    if not page_token:
+                        break
                 
-                # Filter by keyword if provided
-                if filter_keyword and filter_keyword.lower() not in title.lower():
-                    continue
+                if to_delete:
+                    pending.append(executor.submit(self._delete_events_batch, delete_service, to_delete))
                 
-                # Cancel the event
-                cancel_result = self.cancel_event(event_id)
-                if cancel_result['success']:
-                    cancelled_count += 1
-                    cancelled_titles.append(title)
+                cancelled_titles = []
+                for future in pending:
+                    cancelled_titles.extend(future.result())
+            
+            cancelled_count = len(cancelled_titles)
             
             return {
                 "success": True,
@@ -379,6 +579,12 @@ def send_email_tool(
         
         attachment = None
         if attach_trade_blotter:
+            # Make sure the attached workbook reflects the latest saved trades
+            try:
+                from tools.trade_data_tools import refresh_trade_blotter_excel
+                refresh_trade_blotter_excel()
+            except Exception as e:
+                print(f"⚠️  Could not refresh trade blotter Excel export: {e}")
             attachment = str(DATA_DIR / "trade_blotter.xlsx")
         
         result = tools.send_email(
@@ -1,49 +1,8 @@
+import importlib
 
-from .gmail_tools import (
-    send_email_to_client,
-    send_email_with_trade_blotter,
-    create_calendar_reminder,
-    schedule_google_meet,
-    get_client_email_address
-)
-
-from .excel_tools import (
-    read_trade_blotter_csv,
-    get_client_profile,
-    extract_field_from_trade_blotter,
-    open_csv_file,
-    open_excel_file,
-    search_trades_by_ticker,
-    get_trade_statistics
-)
-
-from .trade_tools import (
-    parse_trade_log_with_llm,
-    save_trade_to_csv,
-    parse_and_save_trade_log,
-    get_trade_by_ticket_id
-)
-
-from .compliance_tools import (
-    search_compliance_knowledge_base,
-    get_client_risk_profile,
-    search_trade_history_by_client,
-    search_trade_history_by_ticker,
-    index_client_knowledge_graph,
-    hybrid_search_across_all_collections,
-    check_compliance_violation
-)
-
-from .finance_tools import (
-    get_stock_price_quote,
-    get_company_information,
-    compare_multiple_stocks,
-    get_stock_historical_performance,
-    search_stock_ticker_by_company_name
-)
-
-__all__ = [
+__all__ = (
     "send_email_to_client",
+    "send_email_to_clients",
     "send_email_with_trade_blotter",
     "create_calendar_reminder",
     "schedule_google_meet",
@@ -75,17 +34,18 @@ __all__ = [
     "compare_multiple_stocks",
     "get_stock_historical_performance",
     "search_stock_ticker_by_company_name"
-]
+)
 
-GMAIL_TOOLS = [
+GMAIL_TOOLS = (
     "send_email_to_client",
+    "send_email_to_clients",
     "send_email_with_trade_blotter",
     "create_calendar_reminder",
     "schedule_google_meet",
     "get_client_email_address"
-]
+)
 
-EXCEL_TOOLS = [
+EXCEL_TOOLS = (
     "read_trade_blotter_csv",
     "get_client_profile",
     "extract_field_from_trade_blotter",
@@ -93,16 +53,16 @@ EXCEL_TOOLS = [
     "open_excel_file",
     "search_trades_by_ticker",
     "get_trade_statistics"
-]
+)
 
-TRADE_TOOLS = [
+TRADE_TOOLS = (
     "parse_trade_log_with_llm",
     "save_trade_to_csv",
     "parse_and_save_trade_log",
     "get_trade_by_ticket_id"
-]
+)
 
-COMPLIANCE_TOOLS = [
+COMPLIANCE_TOOLS = (
     "search_compliance_knowledge_base",
     "get_client_risk_profile",
     "search_trade_history_by_client",
@@ -110,12 +70,42 @@ COMPLIANCE_TOOLS = [
     "index_client_knowledge_graph",
     "hybrid_search_across_all_collections",
     "check_compliance_violation"
-]
+)
 
-FINANCE_TOOLS = [
+FINANCE_TOOLS = (
     "get_stock_price_quote",
     "get_company_information",
     "compare_multiple_stocks",
     "get_stock_historical_performance",
     "search_stock_ticker_by_company_name"
-]
+)
+
+# Hashed views of the categories for O(1) membership checks in dispatch
+GMAIL_TOOL_SET = frozenset(GMAIL_TOOLS)
+EXCEL_TOOL_SET = frozenset(EXCEL_TOOLS)
+TRADE_TOOL_SET = frozenset(TRADE_TOOLS)
+COMPLIANCE_TOOL_SET = frozenset(COMPLIANCE_TOOLS)
+FINANCE_TOOL_SET = frozenset(FINANCE_TOOLS)
+
+# Tools are resolved on first access (PEP 562) so importing the package does not
+# pull in pandas, the Google clients, yfinance, or Astra DB until a tool needs them
+_LAZY = {
+    **dict.fromkeys(GMAIL_TOOLS, "gmail_tools"),
+    **dict.fromkeys(EXCEL_TOOLS, "excel_tools"),
+    **dict.fromkeys(TRADE_TOOLS, "trade_tools"),
+    **dict.fromkeys(COMPLIANCE_TOOLS, "compliance_tools"),
+    **dict.fromkeys(FINANCE_TOOLS, "finance_tools"),
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module = importlib.import_module(f".{_LAZY[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,9 +1,152 @@
 from typing import Optional, Dict, List
 from ibm_watsonx_orchestrate.agent_builder.tools import tool, ToolPermission
+import csv
+import functools
+import os
+import shutil
 import sys
+import threading
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+_PROJECT_ROOT = str(Path(__file__).parent.parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+# Optional: pyarrow for multithreaded CSV parsing and the Feather sidecar
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as pa_feather
+    import pyarrow.types as pa_types
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+_DATA_DIR = Path(__file__).parent.parent.parent / "data"
+_TRADE_BLOTTER = _DATA_DIR / "trade_blotter.csv"
+_TRADE_BLOTTER_FEATHER = _DATA_DIR / "trade_blotter.feather"
+_TRADE_BLOTTER_XLSX = _DATA_DIR / "trade_blotter.xlsx"
+
+_blotter_cache = {"mtime": None, "df": None, "indexes": {}}
+
+
+def _read_blotter_csv():
+    """Parse the CSV with Arrow and persist a Feather sidecar for the next process"""
+    table = pa_csv.read_csv(
+        _TRADE_BLOTTER,
+        convert_options=pa_csv.ConvertOptions(strings_can_be_null=True)
+    )
+    
+    # Keep dates as text, matching what pd.read_csv returns
+    schema = pa.schema([
+        pa.field(field.name, pa.string()) if pa_types.is_temporal(field.type) else field
+        for field in table.schema
+    ])
+    table = table.cast(schema)
+    
+    tmp_path = _TRADE_BLOTTER_FEATHER.with_suffix(".feather.tmp")
+    try:
+        pa_feather.write_feather(table, tmp_path)
+        os.replace(tmp_path, _TRADE_BLOTTER_FEATHER)
+    except OSError:
+        pass
+    
+    return table.to_pandas()
+
+
+def _load_blotter():
+    """
+    Load the trade blotter as a DataFrame
+    
+    Reuses the in-process copy while the CSV is unchanged, then prefers a
+    Feather sidecar newer than the CSV over re-parsing it. Callers must not
+    mutate the returned DataFrame.
+    """
+    import pandas as pd
+    
+    csv_mtime = _TRADE_BLOTTER.stat().st_mtime_ns
+    if _blotter_cache["mtime"] == csv_mtime:
+        return _blotter_cache["df"]
+    
+    if not HAS_PYARROW:
+        df = pd.read_csv(_TRADE_BLOTTER)
+    elif (_TRADE_BLOTTER_FEATHER.exists()
+            and _TRADE_BLOTTER_FEATHER.stat().st_mtime_ns >= csv_mtime):
+        df = pd.read_feather(_TRADE_BLOTTER_FEATHER)
+    else:
+        df = _read_blotter_csv()
+    
+    _blotter_cache["mtime"] = csv_mtime
+    _blotter_cache["df"] = df
+    _blotter_cache["indexes"] = {}
+    return df
+
+
+def _blotter_index(key: str, build):
+    """
+    Return (df, index) where index is built once per blotter load by build(df)
+    
+    Indexes are dropped together with the cached DataFrame when the CSV changes.
+    """
+    df = _load_blotter()
+    indexes = _blotter_cache["indexes"]
+    if key not in indexes:
+        indexes[key] = build(df)
+    return df, indexes[key]
+
+
+@functools.lru_cache(maxsize=1)
+def _read_blotter_rows(csv_mtime: int):
+    with open(_TRADE_BLOTTER, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+    return tuple(reader.fieldnames or ()), rows
+
+
+def _load_blotter_rows():
+    """
+    Load the trade blotter as (fieldnames, rows of dicts) with the stdlib csv module
+    
+    Used by single-value lookups that do not need pandas. Cached until the CSV changes.
+    """
+    return _read_blotter_rows(_TRADE_BLOTTER.stat().st_mtime_ns)
+
+
+def _build_client_index(df) -> Dict:
+    """Map lower-cased client name -> row positions"""
+    return dict(df.groupby(df['Client_Name'].astype(str).str.lower()).indices)
+
+
+def _client_rows(client_index: Dict, name_lower: str):
+    """Row positions for clients whose name contains name_lower, in blotter order"""
+    import numpy as np
+    
+    hits = [rows for key, rows in client_index.items() if name_lower in key]
+    if not hits:
+        return None
+    return hits[0] if len(hits) == 1 else np.sort(np.concatenate(hits))
+
+
+def _build_ticker_index(df) -> Dict:
+    """Map upper-cased ticker -> row positions"""
+    return dict(df.groupby(df['Ticker'].astype(str).str.upper()).indices)
+
+
+def _open_in_default_app(file_path: Path):
+    """Open a file with the OS default application without going through a shell"""
+    if sys.platform == "win32":
+        os.startfile(str(file_path))
+        return
+    
+    opener = "open" if sys.platform == "darwin" else "xdg-open"
+    opener_path = shutil.which(opener)
+    if opener_path is None:
+        raise FileNotFoundError(f"'{opener}' not found on PATH")
+    
+    pid = os.posix_spawn(opener_path, [opener, str(file_path)], os.environ)
+    
+    # Reap the opener when it exits so it does not linger as a zombie
+    threading.Thread(target=os.waitpid, args=(pid, 0), daemon=True).start()
 
 
 @tool(
@@ -13,14 +156,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 )
 def read_trade_blotter_csv(filter_column: Optional[str] = None, filter_value: Optional[str] = None) -> str:
     try:
-        import pandas as pd
-        
-        csv_path = Path(__file__).parent.parent.parent / "data" / "trade_blotter.csv"
+        csv_path = _TRADE_BLOTTER
         
         if not csv_path.exists():
             return f"❌ Trade blotter CSV not found at {csv_path}"
         
-        df = pd.read_csv(csv_path)
+        df = _load_blotter()
         
         if filter_column and filter_value:
             if filter_column not in df.columns:
@@ -53,19 +194,19 @@ def get_client_profile(client_name: str) -> str:
     try:
         import pandas as pd
         
-        csv_path = Path(__file__).parent.parent.parent / "data" / "trade_blotter.csv"
+        csv_path = _TRADE_BLOTTER
         
         if not csv_path.exists():
             return f"❌ Trade blotter CSV not found"
         
-        df = pd.read_csv(csv_path)
+        df, client_index = _blotter_index("client", _build_client_index)
         
-        name_lower = client_name.lower()
-        matches = df[df['Client_Name'].astype(str).str.lower().str.contains(name_lower, na=False)]
+        rows = _client_rows(client_index, client_name.lower())
         
-        if matches.empty:
+        if rows is None:
             return f"❌ No client found matching '{client_name}'"
         
+        matches = df.iloc[rows]
         client = matches.iloc[0]
         
         
@@ -91,28 +232,29 @@ def get_client_profile(client_name: str) -> str:
 )
 def extract_field_from_trade_blotter(client_name: str, field_name: str) -> str:
     try:
-        import pandas as pd
-        
-        csv_path = Path(__file__).parent.parent.parent / "data" / "trade_blotter.csv"
+        csv_path = _TRADE_BLOTTER
         
         if not csv_path.exists():
             return f"❌ Trade blotter CSV not found"
         
-        df = pd.read_csv(csv_path)
+        fieldnames, rows = _load_blotter_rows()
         
         name_lower = client_name.lower()
-        matches = df[df['Client_Name'].astype(str).str.lower().str.contains(name_lower, na=False)]
+        match = next(
+            (row for row in rows if name_lower in (row.get('Client_Name') or '').lower()),
+            None
+        )
         
-        if matches.empty:
+        if match is None:
             return f"❌ No client found matching '{client_name}'"
         
-        if field_name not in df.columns:
-            return f"❌ Field '{field_name}' not found. Available fields: {', '.join(df.columns)}"
+        if field_name not in fieldnames:
+            return f"❌ Field '{field_name}' not found. Available fields: {', '.join(fieldnames)}"
         
-        value = matches.iloc[0][field_name]
+        value = match.get(field_name)
         
-        if pd.isna(value):
-            return f"❌ {field_name} is not available for {matches.iloc[0]['Client_Name']}"
+        if not value:
+            return f"❌ {field_name} is not available for {match['Client_Name']}"
         
         return f"✅ {field_name}: {value}"
     
@@ -127,20 +269,12 @@ def extract_field_from_trade_blotter(client_name: str, field_name: str) -> str:
 )
 def open_csv_file() -> str:
     try:
-        import subprocess
-        import platform
-        
-        csv_path = Path(__file__).parent.parent.parent / "data" / "trade_blotter.csv"
+        csv_path = _TRADE_BLOTTER
         
         if not csv_path.exists():
             return f"❌ CSV file not found at {csv_path}"
         
-        if platform.system() == "Windows":
-            subprocess.Popen(["start", "", str(csv_path)], shell=True)
-        elif platform.system() == "Darwin":  # macOS
-            subprocess.Popen(["open", str(csv_path)])
-        else:
-            subprocess.Popen(["xdg-open", str(csv_path)])
+        _open_in_default_app(csv_path)
         
         return f"✅ Opened CSV file: {csv_path.name}\n\nThe trade blotter is now displayed in your default application."
     
@@ -155,20 +289,19 @@ def open_csv_file() -> str:
 )
 def open_excel_file() -> str:
     try:
-        import subprocess
-        import platform
+        excel_path = _TRADE_BLOTTER_XLSX
         
-        excel_path = Path(__file__).parent.parent.parent / "data" / "trade_blotter.xlsx"
+        # Make sure the workbook reflects the latest trades saved to the Parquet store
+        try:
+            from tools.trade_data_tools import refresh_trade_blotter_excel
+            refresh_trade_blotter_excel()
+        except Exception as e:
+            print(f"⚠️  Could not refresh trade blotter Excel export: {e}")
         
         if not excel_path.exists():
             return f"❌ Excel file not found at {excel_path}"
         
-        if platform.system() == "Windows":
-            subprocess.Popen(["start", "", str(excel_path)], shell=True)
-        elif platform.system() == "Darwin":  # macOS
-            subprocess.Popen(["open", str(excel_path)])
-        else:
-            subprocess.Popen(["xdg-open", str(excel_path)])
+        _open_in_default_app(excel_path)
         
         return f"✅ Opened Excel file: {excel_path.name}\n\nThe trade blotter is now displayed in your default application."
     
@@ -183,20 +316,20 @@ def open_excel_file() -> str:
 )
 def search_trades_by_ticker(ticker: str) -> str:
     try:
-        import pandas as pd
-        
-        csv_path = Path(__file__).parent.parent.parent / "data" / "trade_blotter.csv"
+        csv_path = _TRADE_BLOTTER
         
         if not csv_path.exists():
             return f"❌ Trade blotter CSV not found"
         
-        df = pd.read_csv(csv_path)
+        df, ticker_index = _blotter_index("ticker", _build_ticker_index)
         
-        matches = df[df['Ticker'].astype(str).str.upper() == ticker.upper()]
+        rows = ticker_index.get(ticker.upper())
         
-        if matches.empty:
+        if rows is None:
             return f"❌ No trades found for ticker '{ticker}'"
         
+        matches = df.iloc[rows]
+        
         result = f"✅ Found {len(matches)} trade(s) for {ticker.upper()}\n\n"
         result += matches.to_string(index=False)
         
@@ -213,21 +346,23 @@ def search_trades_by_ticker(ticker: str) -> str:
 )
 def get_trade_statistics() -> str:
     try:
-        import pandas as pd
-        
-        csv_path = Path(__file__).parent.parent.parent / "data" / "trade_blotter.csv"
+        csv_path = _TRADE_BLOTTER
         
         if not csv_path.exists():
             return f"❌ Trade blotter CSV not found"
         
-        df = pd.read_csv(csv_path)
+        df = _load_blotter()
         
         if df.empty:
             return "❌ No trades found in blotter"
         
         total_trades = len(df)
-        buy_count = len(df[df['Side'].str.upper() == 'BUY'])
-        sell_count = len(df[df['Side'].str.upper() == 'SELL'])
+        
+        # One hash pass over Side, then fold case on the handful of distinct values
+        side_counts = df['Side'].value_counts()
+        side_counts = side_counts.groupby(side_counts.index.astype(str).str.upper()).sum()
+        buy_count = int(side_counts.get('BUY', 0))
+        sell_count = int(side_counts.get('SELL', 0))
         
         top_clients = df['Client_Name'].value_counts().head(5)
         
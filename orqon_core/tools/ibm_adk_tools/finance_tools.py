@@ -1,9 +1,224 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from ibm_watsonx_orchestrate.agent_builder.tools import tool, ToolPermission
+import functools
+import math
+import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+_PROJECT_ROOT = str(Path(__file__).parent.parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+try:
+    import numpy as np
+    import pandas as pd
+    import yfinance as yf
+    HAS_YFINANCE = True
+except ImportError:
+    HAS_YFINANCE = False
+
+# One HTTP session for every Yahoo request so TCP/TLS connections are kept alive
+# between tool calls. Newer yfinance releases only accept curl_cffi sessions.
+if HAS_YFINANCE:
+    try:
+        from curl_cffi import requests as _yf_http
+        _YF_SESSION = _yf_http.Session(impersonate="chrome")
+    except ImportError:
+        import requests as _yf_http
+        _YF_SESSION = _yf_http.Session()
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+MAX_QUOTE_WORKERS = 10
+
+# Symbols per yf.download request
+QUOTE_BATCH_SIZE = 20
+
+# yfinance .info responses are reused for this many seconds
+INFO_TTL_SECONDS = 30
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_info(ticker: str, epoch_bucket: int) -> dict:
+    """
+    yfinance .info for ticker, memoized per INFO_TTL_SECONDS window
+    
+    epoch_bucket only makes the cache key expire; use _get_info() rather
+    than calling this directly. Clear with _cached_info.cache_clear().
+    """
+    return yf.Ticker(ticker, session=_YF_SESSION).info
+
+
+def _get_info(ticker: str) -> dict:
+    return _cached_info(ticker.upper(), int(time.time() // INFO_TTL_SECONDS))
+
+
+# fast_info field -> the .info key get_stock_price_quote reads it as
+_QUOTE_FIELDS = {
+    'last_price': 'currentPrice',
+    'previous_close': 'previousClose',
+    'day_high': 'dayHigh',
+    'day_low': 'dayLow',
+    'last_volume': 'volume',
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_quote(ticker: str, epoch_bucket: int) -> dict:
+    """
+    Price fields for ticker from the lightweight fast_info endpoint
+    
+    Falls back to the full .info payload if fast_info lacks a field.
+    Memoized per INFO_TTL_SECONDS window like _cached_info.
+    """
+    fast_info = yf.Ticker(ticker, session=_YF_SESSION).fast_info
+    try:
+        quote = {key: fast_info[field] for field, key in _QUOTE_FIELDS.items()}
+    except KeyError:
+        return _get_info(ticker)
+    
+    if None in quote.values():
+        return _get_info(ticker)
+    return quote
+
+
+def _get_quote(ticker: str) -> dict:
+    return _cached_quote(ticker.upper(), int(time.time() // INFO_TTL_SECONDS))
+
+
+# (divisor, suffix) for millions, billions, trillions, indexed by log10 // 3 - 2
+_MARKET_CAP_SCALES = ((1e6, 'M'), (1e9, 'B'), (1e12, 'T'))
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_market_cap(market_cap: float) -> str:
+    """Format a market cap as $1.23T / $4.56B / $7.89M, or whole dollars below $1M"""
+    if not (market_cap and market_cap >= 1e6):
+        return f"${market_cap or 0:,.0f}"
+    
+    divisor, suffix = _MARKET_CAP_SCALES[min(int(math.log10(market_cap)) // 3 - 2, 2)]
+    return f"${market_cap / divisor:.2f}{suffix}"
+
+
+def _fetch_closes(ticker_list: List[str]) -> Dict:
+    """
+    Last two daily closes per ticker, QUOTE_BATCH_SIZE symbols per request
+    
+    Returns ticker -> (last_close, previous_close), or the exception for
+    tickers Yahoo returned no prices for.
+    """
+    closes = {}
+    # yf.download keeps per-call state at module level, so batches run one
+    # after another; it already threads the symbols within a batch
+    for start in range(0, len(ticker_list), QUOTE_BATCH_SIZE):
+        batch = ticker_list[start:start + QUOTE_BATCH_SIZE]
+        data = yf.download(
+            tickers=' '.join(batch),
+            period='2d',
+            group_by='ticker',
+            threads=True,
+            progress=False,
+            session=_YF_SESSION
+        )
+        
+        for ticker in batch:
+            try:
+                frame = data[ticker] if isinstance(data.columns, pd.MultiIndex) else data
+                series = frame['Close'].dropna()
+            except KeyError:
+                series = ()
+            
+            if len(series) == 0:
+                closes[ticker] = ValueError(f"No price data for '{ticker}'")
+            else:
+                prev_close = float(series.iloc[-2]) if len(series) > 1 else 0
+                closes[ticker] = (float(series.iloc[-1]), prev_close)
+    
+    return closes
+
+
+def _fetch_market_cap(stock) -> float:
+    try:
+        return stock.fast_info['market_cap'] or 0
+    except Exception:
+        return 0
+
+
+COMMON_TICKERS = {
+    'tesla': 'TSLA',
+    'apple': 'AAPL',
+    'microsoft': 'MSFT',
+    'google': 'GOOGL',
+    'alphabet': 'GOOGL',
+    'amazon': 'AMZN',
+    'meta': 'META',
+    'facebook': 'META',
+    'netflix': 'NFLX',
+    'nvidia': 'NVDA',
+    'amd': 'AMD',
+    'intel': 'INTC',
+    'rivian': 'RIVN',
+    'lucid': 'LCID',
+    'ford': 'F',
+    'gm': 'GM',
+    'general motors': 'GM',
+    'toyota': 'TM',
+    'walmart': 'WMT',
+    'target': 'TGT',
+    'costco': 'COST',
+    'visa': 'V',
+    'mastercard': 'MA',
+    'paypal': 'PYPL',
+    'disney': 'DIS',
+    'coca cola': 'KO',
+    'pepsi': 'PEP',
+    'boeing': 'BA',
+    'nike': 'NKE',
+    'starbucks': 'SBUX'
+}
+
+if HAS_AHOCORASICK:
+    _ALIAS_AUTOMATON = ahocorasick.Automaton()
+    for _alias, _ticker in COMMON_TICKERS.items():
+        _ALIAS_AUTOMATON.add_word(_alias, (_alias, _ticker))
+    _ALIAS_AUTOMATON.make_automaton()
+else:
+    # Longest alias first so 'general motors' wins over shorter overlaps
+    _ALIAS_PATTERN = re.compile(
+        r'\b(?:' + '|'.join(map(re.escape, sorted(COMMON_TICKERS, key=len, reverse=True))) + r')\b'
+    )
+
+
+def _match_company_alias(name_lower: str) -> Optional[str]:
+    """Find the first known company alias appearing as a whole word in name_lower"""
+    if not HAS_AHOCORASICK:
+        match = _ALIAS_PATTERN.search(name_lower)
+        return COMMON_TICKERS[match.group(0)] if match else None
+    
+    for end, (alias, ticker) in _ALIAS_AUTOMATON.iter(name_lower):
+        start = end - len(alias) + 1
+        if (start == 0 or not name_lower[start - 1].isalnum()) and \
+                (end + 1 == len(name_lower) or not name_lower[end + 1].isalnum()):
+            return ticker
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def _search_ticker(company_name: str) -> str:
+    name_lower = company_name.lower().strip()
+    
+    ticker = COMMON_TICKERS.get(name_lower) or _match_company_alias(name_lower)
+    if ticker:
+        return f"✅ {company_name} → {ticker}"
+    else:
+        return f"❌ Ticker not found for '{company_name}'. Please try the exact ticker symbol instead."
 
 
 @tool(
@@ -12,11 +227,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
     permission=ToolPermission.READ_ONLY
 )
 def get_stock_price_quote(ticker: str) -> str:
+    if not HAS_YFINANCE:
+        return "❌ yfinance library not installed. Run: pip install yfinance"
+    
     try:
-        import yfinance as yf
-        
-        stock = yf.Ticker(ticker.upper())
-        info = stock.info
+        info = _get_quote(ticker)
         
         if not info:
             return f"❌ Could not fetch data for ticker '{ticker}'"
@@ -36,8 +251,6 @@ def get_stock_price_quote(ticker: str) -> str:
         
         return result
     
-    except ImportError:
-        return "❌ yfinance library not installed. Run: pip install yfinance"
     except Exception as e:
         return f"❌ Error fetching stock price: {str(e)}"
 
@@ -48,11 +261,11 @@ def get_stock_price_quote(ticker: str) -> str:
     permission=ToolPermission.READ_ONLY
 )
 def get_company_information(ticker: str) -> str:
+    if not HAS_YFINANCE:
+        return "❌ yfinance library not installed. Run: pip install yfinance"
+    
     try:
-        import yfinance as yf
-        
-        stock = yf.Ticker(ticker.upper())
-        info = stock.info
+        info = _get_info(ticker)
         
         if not info:
             return f"❌ Could not fetch company info for '{ticker}'"
@@ -66,20 +279,11 @@ def get_company_information(ticker: str) -> str:
         country = info.get('country', 'N/A')
         website = info.get('website', 'N/A')
         
-        if market_cap >= 1e12:
-            market_cap_str = f"${market_cap/1e12:.2f}T"
-        elif market_cap >= 1e9:
-            market_cap_str = f"${market_cap/1e9:.2f}B"
-        elif market_cap >= 1e6:
-            market_cap_str = f"${market_cap/1e6:.2f}M"
-        else:
-            market_cap_str = f"${market_cap:,.0f}"
+        market_cap_str = _format_market_cap(market_cap)
         
         
         return result
     
-    except ImportError:
-        return "❌ yfinance library not installed. Run: pip install yfinance"
     except Exception as e:
         return f"❌ Error fetching company info: {str(e)}"
 
@@ -90,34 +294,38 @@ def get_company_information(ticker: str) -> str:
     permission=ToolPermission.READ_ONLY
 )
 def compare_multiple_stocks(tickers: str) -> str:
+    if not HAS_YFINANCE:
+        return "❌ yfinance library not installed"
+    
     try:
-        import yfinance as yf
-        
-        ticker_list = [t.strip().upper() for t in tickers.split(',')]
+        ticker_list = [t.strip().upper() for t in tickers.split(',') if t.strip()]
         
         if len(ticker_list) < 2:
             return "❌ Please provide at least 2 tickers separated by commas"
         
         result = f"✅ STOCK COMPARISON\n{'━' * 60}\n\n"
         
+        # Prices for every symbol in batched requests; market caps from the
+        # lightweight fast_info lookups, fetched concurrently meanwhile
+        stocks = yf.Tickers(' '.join(ticker_list), session=_YF_SESSION).tickers
+        with ThreadPoolExecutor(max_workers=min(MAX_QUOTE_WORKERS, len(ticker_list))) as executor:
+            market_caps = executor.map(_fetch_market_cap, [stocks[t] for t in ticker_list])
+            closes = _fetch_closes(ticker_list)
+            market_caps = dict(zip(ticker_list, market_caps))
+        
         for ticker in ticker_list:
             try:
-                stock = yf.Ticker(ticker)
-                info = stock.info
+                quote = closes[ticker]
+                if isinstance(quote, Exception):
+                    raise quote
                 
-                current_price = info.get('currentPrice') or info.get('regularMarketPrice', 0)
-                prev_close = info.get('previousClose', 0)
-                market_cap = info.get('marketCap', 0)
+                current_price, prev_close = quote
+                market_cap = market_caps[ticker]
                 
                 change = current_price - prev_close
                 change_pct = (change / prev_close * 100) if prev_close > 0 else 0
                 
-                if market_cap >= 1e12:
-                    mcap_str = f"{market_cap/1e12:.2f}T"
-                elif market_cap >= 1e9:
-                    mcap_str = f"{market_cap/1e9:.2f}B"
-                else:
-                    mcap_str = "N/A"
+                mcap_str = _format_market_cap(market_cap) if market_cap else "N/A"
                 
                 change_emoji = "🟢" if change >= 0 else "🔴"
                 change_sign = "+" if change >= 0 else ""
@@ -129,8 +337,6 @@ def compare_multiple_stocks(tickers: str) -> str:
         
         return result
     
-    except ImportError:
-        return "❌ yfinance library not installed"
     except Exception as e:
         return f"❌ Error comparing stocks: {str(e)}"
 
@@ -141,28 +347,28 @@ def compare_multiple_stocks(tickers: str) -> str:
     permission=ToolPermission.READ_ONLY
 )
 def get_stock_historical_performance(ticker: str, period: str = "1mo") -> str:
+    if not HAS_YFINANCE:
+        return "❌ yfinance library not installed"
+    
     try:
-        import yfinance as yf
-        
-        stock = yf.Ticker(ticker.upper())
+        stock = yf.Ticker(ticker.upper(), session=_YF_SESSION)
         hist = stock.history(period=period)
         
         if hist.empty:
             return f"❌ No historical data found for '{ticker}'"
         
-        start_price = hist['Close'].iloc[0]
-        end_price = hist['Close'].iloc[-1]
-        high = hist['High'].max()
-        low = hist['Low'].min()
-        avg_volume = hist['Volume'].mean()
+        # One float block for all four columns; nan-reductions match pandas' NaN skipping
+        arr = hist[['Close', 'High', 'Low', 'Volume']].to_numpy(dtype=float)
+        start_price, end_price = arr[0, 0], arr[-1, 0]
+        high = np.nanmax(arr[:, 1])
+        low = np.nanmin(arr[:, 2])
+        avg_volume = np.nanmean(arr[:, 3])
         
         total_return = ((end_price - start_price) / start_price) * 100
         
         
         return result
     
-    except ImportError:
-        return "❌ yfinance library not installed"
     except Exception as e:
         return f"❌ Error fetching historical data: {str(e)}"
 
@@ -173,43 +379,4 @@ def get_stock_historical_performance(ticker: str, period: str = "1mo") -> str:
     permission=ToolPermission.READ_ONLY
 )
 def search_stock_ticker_by_company_name(company_name: str) -> str:
-    common_tickers = {
-        'tesla': 'TSLA',
-        'apple': 'AAPL',
-        'microsoft': 'MSFT',
-        'google': 'GOOGL',
-        'alphabet': 'GOOGL',
-        'amazon': 'AMZN',
-        'meta': 'META',
-        'facebook': 'META',
-        'netflix': 'NFLX',
-        'nvidia': 'NVDA',
-        'amd': 'AMD',
-        'intel': 'INTC',
-        'rivian': 'RIVN',
-        'lucid': 'LCID',
-        'ford': 'F',
-        'gm': 'GM',
-        'general motors': 'GM',
-        'toyota': 'TM',
-        'walmart': 'WMT',
-        'target': 'TGT',
-        'costco': 'COST',
-        'visa': 'V',
-        'mastercard': 'MA',
-        'paypal': 'PYPL',
-        'disney': 'DIS',
-        'coca cola': 'KO',
-        'pepsi': 'PEP',
-        'boeing': 'BA',
-        'nike': 'NKE',
-        'starbucks': 'SBUX'
-    }
-    
-    name_lower = company_name.lower().strip()
-    
-    if name_lower in common_tickers:
-        ticker = common_tickers[name_lower]
-        return f"✅ {company_name} → {ticker}"
-    else:
-        return f"❌ Ticker not found for '{company_name}'. Please try the exact ticker symbol instead."
+    return _search_ticker(company_name)
@@ -1,11 +1,40 @@
 from typing import Optional, List, Dict
 from ibm_watsonx_orchestrate.agent_builder.tools import tool, ToolPermission
+import functools
 import sys
+import threading
+from datetime import datetime
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+_PROJECT_ROOT = str(Path(__file__).parent.parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
 
 from tools.google_workspace_tools import GoogleWorkspaceTools
+from tools.ibm_adk_tools.excel_tools import _TRADE_BLOTTER, _blotter_index
+
+_TRADE_BLOTTER_STR = str(_TRADE_BLOTTER)
+
+_gmail_client_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _build_gmail_client() -> GoogleWorkspaceTools:
+    return GoogleWorkspaceTools()
+
+
+def _get_gmail_client() -> GoogleWorkspaceTools:
+    """Shared GoogleWorkspaceTools, authenticated once per process"""
+    with _gmail_client_lock:
+        return _build_gmail_client()
+
+
+def _build_client_email_index(df) -> List:
+    """(lower-cased name, full name, email) for each distinct client, in blotter order"""
+    names = df['Client_Name']
+    keys = names.str.lower()
+    first = keys.notna() & ~keys.duplicated()
+    return list(zip(keys[first], names[first], df['email'][first]))
 
 
 @tool(
@@ -20,7 +49,7 @@ def send_email_to_client(
     cc_emails: Optional[List[str]] = None
 ) -> str:
     try:
-        gmail = GoogleWorkspaceTools()
+        gmail = _get_gmail_client()
         
         result = gmail.send_email(
             to_email=to_email,
@@ -38,6 +67,37 @@ def send_email_to_client(
         return f"❌ Error sending email: {str(e)}"
 
 
+@tool(
+    name="send_email_to_clients",
+    description="Send the same professional email to several clients at once via Gmail, one message per recipient. Use for bulk client communications such as market updates or meeting reminders.",
+    permission=ToolPermission.ADMIN
+)
+def send_email_to_clients(
+    to_emails: List[str],
+    subject: str,
+    body: str
+) -> str:
+    try:
+        gmail = _get_gmail_client()
+        
+        # Sends run concurrently, so N recipients cost about one round trip
+        results = gmail.send_emails([
+            {"to_email": to_email, "subject": subject, "body": body}
+            for to_email in to_emails
+        ])
+        
+        lines = [
+            f"✅ {to_email} (Message ID: {result.get('message_id', 'N/A')})" if result["success"]
+            else f"❌ {to_email}: {result.get('error', 'Unknown error')}"
+            for to_email, result in zip(to_emails, results)
+        ]
+        sent = sum(result["success"] for result in results)
+        return f"📧 Sent {sent}/{len(to_emails)} emails\n" + "\n".join(lines)
+    
+    except Exception as e:
+        return f"❌ Error sending emails: {str(e)}"
+
+
 @tool(
     name="send_email_with_trade_blotter",
     description="Send email with trade blotter Excel file attached. Use when client requests trade summary spreadsheet or full trade report.",
@@ -49,19 +109,16 @@ def send_email_with_trade_blotter(
     body: str
 ) -> str:
     try:
-        gmail = GoogleWorkspaceTools()
-        
-        data_dir = Path(__file__).parent.parent.parent / "data"
-        trade_blotter_path = data_dir / "trade_blotter.csv"
+        gmail = _get_gmail_client()
         
-        if not trade_blotter_path.exists():
-            return f"❌ Trade blotter file not found at {trade_blotter_path}"
+        if not _TRADE_BLOTTER.exists():
+            return f"❌ Trade blotter file not found at {_TRADE_BLOTTER_STR}"
         
         result = gmail.send_email(
             to_email=to_email,
             subject=subject,
             body=body,
-            attachment_path=str(trade_blotter_path)
+            attachment_paths=[_TRADE_BLOTTER_STR]
         )
         
         if result["success"]:
@@ -84,9 +141,7 @@ def create_calendar_reminder(
     notes: str = ""
 ) -> str:
     try:
-        from datetime import datetime
-        
-        gmail = GoogleWorkspaceTools()
+        gmail = _get_gmail_client()
         reminder_time = datetime.fromisoformat(reminder_datetime)
         
         result = gmail.create_reminder(
@@ -117,9 +172,7 @@ def schedule_google_meet(
     description: str = ""
 ) -> str:
     try:
-        from datetime import datetime
-        
-        gmail = GoogleWorkspaceTools()
+        gmail = _get_gmail_client()
         start_time = datetime.fromisoformat(start_datetime)
         
         result = gmail.schedule_meeting(
@@ -150,24 +203,18 @@ def schedule_google_meet(
 )
 def get_client_email_address(client_name: str) -> str:
     try:
-        import pandas as pd
-        from pathlib import Path
-        
-        csv_path = Path(__file__).parent.parent.parent / "data" / "trade_blotter.csv"
-        
-        if not csv_path.exists():
+        if not _TRADE_BLOTTER.exists():
             return f"❌ Trade blotter CSV not found"
         
-        df = pd.read_csv(csv_path)
+        _, email_index = _blotter_index("client_email", _build_client_email_index)
         
         name_lower = client_name.lower()
-        matches = df[df['Client_Name'].str.lower().str.contains(name_lower, na=False)]
+        match = next((entry for entry in email_index if name_lower in entry[0]), None)
         
-        if matches.empty:
+        if match is None:
             return f"❌ No client found matching '{client_name}'"
         
-        email = matches.iloc[0]['email']
-        full_name = matches.iloc[0]['Client_Name']
+        _, full_name, email = match
         
         return f"✅ {full_name}: {email}"
     
@@ -1,9 +1,198 @@
 from typing import Dict, List, Optional
 from ibm_watsonx_orchestrate.agent_builder.tools import tool, ToolPermission
+import atexit
+import csv
+import json
+import os
 import sys
+import threading
+from datetime import datetime
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+_PROJECT_ROOT = str(Path(__file__).parent.parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from tools.ibm_adk_tools.excel_tools import _TRADE_BLOTTER, _blotter_index
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+_BLOTTER_FIELDS = [
+    'Ticket ID', 'Client', 'Account', 'Side', 'Ticker', 'Qty',
+    'Type', 'Price', 'Solicited', 'Timestamp', 'Notes',
+    'Follow-up', 'Email', 'Stage', 'Meeting'
+]
+
+
+class _BlotterWriter:
+    """
+    Append handle on the trade blotter CSV, kept open across save_trade_to_csv calls
+    
+    The file is reopened if it has been replaced or deleted on disk since it
+    was opened (e.g. regenerated by another process).
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._inode = None
+        self._writer = None
+        self._header_written = False
+        atexit.register(self.close)
+    
+    def _open(self):
+        self._close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', newline='', encoding='utf-8', buffering=1)
+        st = os.fstat(self._file.fileno())
+        self._inode = st.st_ino
+        self._header_written = st.st_size > 0
+        self._writer = csv.DictWriter(self._file, fieldnames=_BLOTTER_FIELDS)
+    
+    def _is_stale(self) -> bool:
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except FileNotFoundError:
+            return True
+    
+    def writerows(self, rows: List[Dict]):
+        with self._lock:
+            if self._file is None or self._is_stale():
+                self._open()
+            if not self._header_written:
+                self._writer.writeheader()
+                self._header_written = True
+            self._writer.writerows(rows)
+    
+    def writerow(self, row: Dict):
+        self.writerows([row])
+    
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+_blotter_writer = _BlotterWriter(_TRADE_BLOTTER)
+
+
+def _trade_row(
+    ticket_id: str,
+    client_name: str,
+    account_number: str,
+    side: str,
+    ticker: str,
+    quantity: int,
+    order_type: str = "Market",
+    price: float = 0.0,
+    solicited: bool = True,
+    notes: str = "",
+    follow_up_date: str = "",
+    email: str = "",
+    stage: str = "Pending",
+    meeting_needed: bool = False,
+    timestamp: Optional[str] = None
+) -> Dict:
+    """Build a blotter CSV row from save_trade_to_csv-style arguments"""
+    return {
+        'Ticket ID': ticket_id,
+        'Client': client_name,
+        'Account': account_number,
+        'Side': side,
+        'Ticker': ticker.upper(),
+        'Qty': quantity,
+        'Type': order_type,
+        'Price': price,
+        'Solicited': 'Yes' if solicited else 'No',
+        'Timestamp': timestamp or datetime.now().strftime("%Y-%m-%d %I:%M %p"),
+        'Notes': notes,
+        'Follow-up': follow_up_date,
+        'Email': email,
+        'Stage': stage,
+        'Meeting': 'Yes' if meeting_needed else 'No'
+    }
+
+
+def _save_trades_to_csv(trade_rows: List[Dict]):
+    """Append all rows to the blotter in one writerows call"""
+    _blotter_writer.writerows(trade_rows)
+
+
+def _build_ticket_index(df) -> Dict:
+    """Map upper-cased ticket ID -> row position of its first occurrence"""
+    ids = df['Ticket ID'].astype(str).str.upper().tolist()
+    return {ticket: row for row, ticket in reversed(list(enumerate(ids)))}
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _decode_json_object(text: str, start: int) -> Dict:
+    """Decode the JSON object starting at text[start], ignoring anything after it"""
+    if HAS_ORJSON:
+        # Fast path: the object usually runs to the last closing brace
+        try:
+            return orjson.loads(text[start:text.rfind('}') + 1])
+        except orjson.JSONDecodeError:
+            pass
+    return _JSON_DECODER.raw_decode(text, start)[0]
+
+
+def _dumps(obj) -> str:
+    if HAS_ORJSON:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+class _TradeLogParseError(ValueError):
+    """Raised when the LLM response does not contain usable trades"""
+
+
+def _parse_trade_log_impl(trade_log: str) -> Dict:
+    """Parse a trade log with the LLM and return {"success": True, "trades": [...]}"""
+    from watsonx_llm import WatsonxLLM
+    from langchain_core.messages import SystemMessage, HumanMessage
+    
+    llm = WatsonxLLM()
+    
+    
+    messages = [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=f"Parse this trade log:\n\n{trade_log}")
+    ]
+    
+    response = llm.invoke(messages)
+    response_text = response.content.strip()
+    
+    json_start = response_text.find('{')
+    
+    if json_start == -1:
+        raise _TradeLogParseError("Could not parse trade log. No valid JSON found in LLM response.")
+    
+    parsed_data = _decode_json_object(response_text, json_start)
+    trades = parsed_data.get('trades', [])
+    
+    if not trades:
+        raise _TradeLogParseError("No trades found in the log.")
+    
+    now = datetime.now()
+    default_ticket_id = f"TKT-{now.strftime('%Y%m%d%H%M%S')}"
+    timestamp = now.strftime("%Y-%m-%d %I:%M %p")
+    for trade in trades:
+        if not trade.get('ticket_id'):
+            trade['ticket_id'] = default_ticket_id
+        trade['timestamp'] = timestamp
+    
+    return {"success": True, "trades": trades}
 
 
 @tool(
@@ -13,41 +202,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 )
 def parse_trade_log_with_llm(trade_log: str) -> str:
     try:
-        from watsonx_llm import WatsonxLLM
-        from langchain_core.messages import SystemMessage, HumanMessage
-        import json
-        from datetime import datetime
-        
-        llm = WatsonxLLM()
-        
-        
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Parse this trade log:\n\n{trade_log}")
-        ]
-        
-        response = llm.invoke(messages)
-        response_text = response.content.strip()
-        
-        json_start = response_text.find('{')
-        json_end = response_text.rfind('}') + 1
-        
-        if json_start == -1 or json_end <= json_start:
-            return "❌ Could not parse trade log. No valid JSON found in LLM response."
-        
-        parsed_data = json.loads(response_text[json_start:json_end])
-        trades = parsed_data.get('trades', [])
-        
-        if not trades:
-            return "❌ No trades found in the log."
-        
-        for trade in trades:
-            if not trade.get('ticket_id'):
-                trade['ticket_id'] = f"TKT-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-            trade['timestamp'] = datetime.now().strftime("%Y-%m-%d %I:%M %p")
-        
-        return json.dumps({"success": True, "trades": trades}, indent=2)
+        return _dumps(_parse_trade_log_impl(trade_log))
     
+    except _TradeLogParseError as e:
+        return f"❌ {e}"
     except Exception as e:
         return f"❌ Error parsing trade log: {str(e)}"
 
@@ -74,40 +232,11 @@ def save_trade_to_csv(
     meeting_needed: bool = False
 ) -> str:
     try:
-        import csv
-        from datetime import datetime
-        
-        csv_path = Path(__file__).parent.parent.parent / "data" / "trade_blotter.csv"
-        
-        csv_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(csv_path, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                'Ticket ID', 'Client', 'Account', 'Side', 'Ticker', 'Qty',
-                'Type', 'Price', 'Solicited', 'Timestamp', 'Notes',
-                'Follow-up', 'Email', 'Stage', 'Meeting'
-            ])
-            
-            if csv_path.stat().st_size == 0:
-                writer.writeheader()
-            
-            writer.writerow({
-                'Ticket ID': ticket_id,
-                'Client': client_name,
-                'Account': account_number,
-                'Side': side,
-                'Ticker': ticker.upper(),
-                'Qty': quantity,
-                'Type': order_type,
-                'Price': price,
-                'Solicited': 'Yes' if solicited else 'No',
-                'Timestamp': datetime.now().strftime("%Y-%m-%d %I:%M %p"),
-                'Notes': notes,
-                'Follow-up': follow_up_date,
-                'Email': email,
-                'Stage': stage,
-                'Meeting': 'Yes' if meeting_needed else 'No'
-            })
+        _blotter_writer.writerow(_trade_row(
+            ticket_id, client_name, account_number, side, ticker, quantity,
+            order_type, price, solicited, notes, follow_up_date, email,
+            stage, meeting_needed
+        ))
         
         
         if meeting_needed:
@@ -126,27 +255,18 @@ def save_trade_to_csv(
 )
 def parse_and_save_trade_log(trade_log: str) -> str:
     try:
-        import json
-        from datetime import datetime
-        
-        parse_result = parse_trade_log_with_llm(trade_log)
-        
-        if parse_result.startswith("❌"):
-            return parse_result
-        
-        parsed_data = json.loads(parse_result)
-        
-        if not parsed_data.get('success'):
-            return "❌ Failed to parse trade log"
+        try:
+            parsed_data = _parse_trade_log_impl(trade_log)
+        except _TradeLogParseError as e:
+            return f"❌ {e}"
         
         trades = parsed_data.get('trades', [])
         
         if not trades:
             return "❌ No trades found in log"
         
-        results = []
-        for trade in trades:
-            save_result = save_trade_to_csv(
+        rows = [
+            _trade_row(
                 ticket_id=trade.get('ticket_id', f"TKT-{datetime.now().strftime('%Y%m%d%H%M%S')}"),
                 client_name=trade.get('client_name', ''),
                 account_number=trade.get('account_number', ''),
@@ -160,9 +280,23 @@ def parse_and_save_trade_log(trade_log: str) -> str:
                 follow_up_date=trade.get('follow_up_date', ''),
                 email=trade.get('email', ''),
                 stage=trade.get('stage', 'Pending'),
-                meeting_needed=trade.get('meeting_needed', False)
+                meeting_needed=trade.get('meeting_needed', False),
+                timestamp=trade.get('timestamp')
             )
-            results.append(save_result)
+            for trade in trades
+        ]
+        
+        try:
+            _save_trades_to_csv(rows)
+        except Exception as e:
+            return f"❌ Error saving trades to CSV: {str(e)}"
+        
+        results = []
+        for row in rows:
+            line = f"✅ {row['Ticket ID']}: {row['Side']} {row['Qty']} {row['Ticker']} for {row['Client']}"
+            if row['Meeting'] == 'Yes':
+                line += "\n⚠️  Meeting Required"
+            results.append(line)
         
         summary = f"✅ Successfully processed {len(trades)} trade(s)\n\n"
         summary += "\n\n".join(results)
@@ -180,21 +314,17 @@ def parse_and_save_trade_log(trade_log: str) -> str:
 )
 def get_trade_by_ticket_id(ticket_id: str) -> str:
     try:
-        import pandas as pd
-        
-        csv_path = Path(__file__).parent.parent.parent / "data" / "trade_blotter.csv"
-        
-        if not csv_path.exists():
+        if not _TRADE_BLOTTER.exists():
             return f"❌ Trade blotter CSV not found"
         
-        df = pd.read_csv(csv_path)
+        df, ticket_index = _blotter_index("ticket", _build_ticket_index)
         
-        matches = df[df['Ticket ID'].astype(str).str.upper() == ticket_id.upper()]
+        row = ticket_index.get(ticket_id.upper())
         
-        if matches.empty:
+        if row is None:
             return f"❌ No trade found with ticket ID '{ticket_id}'"
         
-        trade = matches.iloc[0]
+        trade = df.iloc[row]
         
         
         return result
@@ -2,192 +2,201 @@ import sys
 from pathlib import Path
 
 project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
-
-print("🧪 IBM ADK TOOLS VALIDATION\n" + "="*60)
-
-print("\n📦 Testing Tool Imports...")
-
-try:
-    from tools.ibm_adk_tools import (
-        send_email_to_client,
-        send_email_with_trade_blotter,
-        create_calendar_reminder,
-        schedule_google_meet,
-        get_client_email_address,
-        
-        read_trade_blotter_csv,
-        get_client_profile,
-        extract_field_from_trade_blotter,
-        open_csv_file,
-        open_excel_file,
-        search_trades_by_ticker,
-        get_trade_statistics,
-        
-        parse_trade_log_with_llm,
-        save_trade_to_csv,
-        parse_and_save_trade_log,
-        get_trade_by_ticket_id,
-        
-        search_compliance_knowledge_base,
-        get_client_risk_profile,
-        search_trade_history_by_client,
-        search_trade_history_by_ticker,
-        index_client_knowledge_graph,
-        hybrid_search_across_all_collections,
-        check_compliance_violation,
-        
-        get_stock_price_quote,
-        get_company_information,
-        compare_multiple_stocks,
-        get_stock_historical_performance,
-        search_stock_ticker_by_company_name
-    )
-    print("✅ All 28 tools imported successfully")
-except ImportError as e:
-    print(f"❌ Import failed: {e}")
-    sys.exit(1)
-
-print("\n🎯 Verifying @tool Decorators...")
-
-tools_to_verify = [
-    ("Gmail", [
-        send_email_to_client,
-        send_email_with_trade_blotter,
-        create_calendar_reminder,
-        schedule_google_meet,
-        get_client_email_address
-    ]),
-    ("Excel", [
-        read_trade_blotter_csv,
-        get_client_profile,
-        extract_field_from_trade_blotter,
-        open_csv_file,
-        open_excel_file,
-        search_trades_by_ticker,
-        get_trade_statistics
-    ]),
-    ("Trade", [
-        parse_trade_log_with_llm,
-        save_trade_to_csv,
-        parse_and_save_trade_log,
-        get_trade_by_ticket_id
-    ]),
-    ("Compliance", [
-        search_compliance_knowledge_base,
-        get_client_risk_profile,
-        search_trade_history_by_client,
-        search_trade_history_by_ticker,
-        index_client_knowledge_graph,
-        hybrid_search_across_all_collections,
-        check_compliance_violation
-    ]),
-    ("Finance", [
-        get_stock_price_quote,
-        get_company_information,
-        compare_multiple_stocks,
-        get_stock_historical_performance,
-        search_stock_ticker_by_company_name
-    ])
-]
-
-total_tools = 0
-verified_tools = 0
-
-for category, tools in tools_to_verify:
-    print(f"\n📁 {category} Tools:")
-    for tool_func in tools:
-        total_tools += 1
-        
-        if hasattr(tool_func, 'name'):
-            tool_name = tool_func.name
-        elif hasattr(tool_func, '__name__'):
-            tool_name = tool_func.__name__
-        else:
-            tool_name = str(tool_func)
-        
-        is_adk_tool = hasattr(tool_func, 'permission') or 'PythonTool' in str(type(tool_func))
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+def main():
+    print("🧪 IBM ADK TOOLS VALIDATION\n" + "="*60)
+
+    print("\n📦 Testing Tool Imports...")
+
+    try:
+        from tools.ibm_adk_tools import (
+            send_email_to_client,
+            send_email_to_clients,
+            send_email_with_trade_blotter,
+            create_calendar_reminder,
+            schedule_google_meet,
+            get_client_email_address,
+            
+            read_trade_blotter_csv,
+            get_client_profile,
+            extract_field_from_trade_blotter,
+            open_csv_file,
+            open_excel_file,
+            search_trades_by_ticker,
+            get_trade_statistics,
+            
+            parse_trade_log_with_llm,
+            save_trade_to_csv,
+            parse_and_save_trade_log,
+            get_trade_by_ticket_id,
+            
+            search_compliance_knowledge_base,
+            get_client_risk_profile,
+            search_trade_history_by_client,
+            search_trade_history_by_ticker,
+            index_client_knowledge_graph,
+            hybrid_search_across_all_collections,
+            check_compliance_violation,
+            
+            get_stock_price_quote,
+            get_company_information,
+            compare_multiple_stocks,
+            get_stock_historical_performance,
+            search_stock_ticker_by_company_name
+        )
+        print("✅ All 29 tools imported successfully")
+    except ImportError as e:
+        print(f"❌ Import failed: {e}")
+        sys.exit(1)
+
+    print("\n🎯 Verifying @tool Decorators...")
+
+    tools_to_verify = [
+        ("Gmail", [
+            send_email_to_client,
+            send_email_to_clients,
+            send_email_with_trade_blotter,
+            create_calendar_reminder,
+            schedule_google_meet,
+            get_client_email_address
+        ]),
+        ("Excel", [
+            read_trade_blotter_csv,
+            get_client_profile,
+            extract_field_from_trade_blotter,
+            open_csv_file,
+            open_excel_file,
+            search_trades_by_ticker,
+            get_trade_statistics
+        ]),
+        ("Trade", [
+            parse_trade_log_with_llm,
+            save_trade_to_csv,
+            parse_and_save_trade_log,
+            get_trade_by_ticket_id
+        ]),
+        ("Compliance", [
+            search_compliance_knowledge_base,
+            get_client_risk_profile,
+            search_trade_history_by_client,
+            search_trade_history_by_ticker,
+            index_client_knowledge_graph,
+            hybrid_search_across_all_collections,
+            check_compliance_violation
+        ]),
+        ("Finance", [
+            get_stock_price_quote,
+            get_company_information,
+            compare_multiple_stocks,
+            get_stock_historical_performance,
+            search_stock_ticker_by_company_name
+        ])
+    ]
+
+    total_tools = 0
+    verified_tools = 0
+
+    for category, tools in tools_to_verify:
+        print(f"\n📁 {category} Tools:")
+        for tool_func in tools:
+            total_tools += 1
+            
+            if hasattr(tool_func, 'name'):
+                tool_name = tool_func.name
+            elif hasattr(tool_func, '__name__'):
+                tool_name = tool_func.__name__
+            else:
+                tool_name = str(tool_func)
+            
+            is_adk_tool = hasattr(tool_func, 'permission') or 'PythonTool' in str(type(tool_func))
+            
+            if is_adk_tool:
+                verified_tools += 1
+                print(f"  ✅ {tool_name}")
+            else:
+                print(f"  ⚠️  {tool_name} (not an IBM ADK tool)")
+
+    print(f"\n{'='*60}")
+    print(f"📊 Verification Results:")
+    print(f"  Total Tools: {total_tools}")
+    print(f"  Verified: {verified_tools}")
+    print(f"  Pass Rate: {verified_tools/total_tools*100:.1f}%")
+
+    if verified_tools == total_tools:
+        print("\n🎉 ALL TOOLS VALIDATED SUCCESSFULLY")
+        print("✅ Ready for IBM watsonx Orchestrate import")
+    else:
+        print(f"\n⚠️  {total_tools - verified_tools} tools need attention")
+
+    print(f"\n{'='*60}")
+    print("📋 Testing Tool Categories...")
+
+    try:
+        from tools.ibm_adk_tools import (
+            GMAIL_TOOLS,
+            EXCEL_TOOLS,
+            TRADE_TOOLS,
+            COMPLIANCE_TOOLS,
+            FINANCE_TOOLS
+        )
         
-        if is_adk_tool:
-            verified_tools += 1
-            print(f"  ✅ {tool_name}")
+        print(f"  Gmail Tools: {len(GMAIL_TOOLS)}")
+        print(f"  Excel Tools: {len(EXCEL_TOOLS)}")
+        print(f"  Trade Tools: {len(TRADE_TOOLS)}")
+        print(f"  Compliance Tools: {len(COMPLIANCE_TOOLS)}")
+        print(f"  Finance Tools: {len(FINANCE_TOOLS)}")
+        print(f"  Total: {len(GMAIL_TOOLS) + len(EXCEL_TOOLS) + len(TRADE_TOOLS) + len(COMPLIANCE_TOOLS) + len(FINANCE_TOOLS)}")
+        print("✅ Tool categories verified")
+    except ImportError as e:
+        print(f"❌ Category import failed: {e}")
+
+    print(f"\n{'='*60}")
+    print("📂 Checking File Structure...")
+
+    tool_dir = Path(__file__).parent
+    required_files = [
+        "__init__.py",
+        "requirements.txt",
+        "gmail_tools.py",
+        "excel_tools.py",
+        "trade_tools.py",
+        "compliance_tools.py",
+        "finance_tools.py"
+    ]
+
+    all_files_exist = True
+    for filename in required_files:
+        file_path = tool_dir / filename
+        if file_path.exists():
+            print(f"  ✅ {filename}")
         else:
-            print(f"  ⚠️  {tool_name} (not an IBM ADK tool)")
-
-print(f"\n{'='*60}")
-print(f"📊 Verification Results:")
-print(f"  Total Tools: {total_tools}")
-print(f"  Verified: {verified_tools}")
-print(f"  Pass Rate: {verified_tools/total_tools*100:.1f}%")
-
-if verified_tools == total_tools:
-    print("\n🎉 ALL TOOLS VALIDATED SUCCESSFULLY")
-    print("✅ Ready for IBM watsonx Orchestrate import")
-else:
-    print(f"\n⚠️  {total_tools - verified_tools} tools need attention")
-
-print(f"\n{'='*60}")
-print("📋 Testing Tool Categories...")
-
-try:
-    from tools.ibm_adk_tools import (
-        GMAIL_TOOLS,
-        EXCEL_TOOLS,
-        TRADE_TOOLS,
-        COMPLIANCE_TOOLS,
-        FINANCE_TOOLS
-    )
-    
-    print(f"  Gmail Tools: {len(GMAIL_TOOLS)}")
-    print(f"  Excel Tools: {len(EXCEL_TOOLS)}")
-    print(f"  Trade Tools: {len(TRADE_TOOLS)}")
-    print(f"  Compliance Tools: {len(COMPLIANCE_TOOLS)}")
-    print(f"  Finance Tools: {len(FINANCE_TOOLS)}")
-    print(f"  Total: {len(GMAIL_TOOLS) + len(EXCEL_TOOLS) + len(TRADE_TOOLS) + len(COMPLIANCE_TOOLS) + len(FINANCE_TOOLS)}")
-    print("✅ Tool categories verified")
-except ImportError as e:
-    print(f"❌ Category import failed: {e}")
-
-print(f"\n{'='*60}")
-print("📂 Checking File Structure...")
-
-tool_dir = Path(__file__).parent
-required_files = [
-    "__init__.py",
-    "requirements.txt",
-    "gmail_tools.py",
-    "excel_tools.py",
-    "trade_tools.py",
-    "compliance_tools.py",
-    "finance_tools.py"
-]
-
-all_files_exist = True
-for filename in required_files:
-    file_path = tool_dir / filename
-    if file_path.exists():
-        print(f"  ✅ {filename}")
+            print(f"  ❌ {filename} (missing)")
+            all_files_exist = False
+
+    if all_files_exist:
+        print("✅ All required files present")
     else:
-        print(f"  ❌ {filename} (missing)")
-        all_files_exist = False
-
-if all_files_exist:
-    print("✅ All required files present")
-else:
-    print("⚠️  Some files missing")
-
-print(f"\n{'='*60}")
-print("🎯 IBM ADK COMPLIANCE SUMMARY")
-print(f"{'='*60}")
-print("✅ Tool Decorator Pattern: IMPLEMENTED")
-print("✅ Type Hints: VERIFIED")
-print("✅ Docstrings: VERIFIED")
-print("✅ Package Structure: VERIFIED")
-print("✅ Requirements.txt: PRESENT")
-print("✅ Tool Categories: ORGANIZED")
-print(f"\n🎉 PROJECT STATUS: 100% IBM ADK COMPLIANT")
-print(f"\n📦 Ready for import command:")
-print(f'   orchestrate tools import -k python \\')
-print(f'       -p "tools/ibm_adk_tools" \\')
-print(f'       -r "tools/ibm_adk_tools/requirements.txt"')
-print(f"\n{'='*60}")
+        print("⚠️  Some files missing")
+
+    print(f"\n{'='*60}")
+    print("🎯 IBM ADK COMPLIANCE SUMMARY")
+    print(f"{'='*60}")
+    print("✅ Tool Decorator Pattern: IMPLEMENTED")
+    print("✅ Type Hints: VERIFIED")
+    print("✅ Docstrings: VERIFIED")
+    print("✅ Package Structure: VERIFIED")
+    print("✅ Requirements.txt: PRESENT")
+    print("✅ Tool Categories: ORGANIZED")
+    print(f"\n🎉 PROJECT STATUS: 100% IBM ADK COMPLIANT")
+    print(f"\n📦 Ready for import command:")
+    print(f'   orchestrate tools import -k python \\')
+    print(f'       -p "tools/ibm_adk_tools" \\')
+    print(f'       -r "tools/ibm_adk_tools/requirements.txt"')
+    print(f"\n{'='*60}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,29 +2,311 @@
 Memory Management System
 Short-term (conversation buffer) + Long-term (persistent storage)
 """
+import atexit
+import functools
+import hashlib
+import itertools
 import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import chromadb
 from chromadb.config import Settings
 from chromadb.utils import embedding_functions
 from pathlib import Path
 from typing import List, Dict, Optional, Literal
 from datetime import datetime
-from collections import deque
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 # Paths
 DATA_DIR = Path(__file__).parent.parent / "data"
 MEMORY_DIR = DATA_DIR / "memory"
 CHROMA_DIR = MEMORY_DIR / "chroma_db"
-SHORT_TERM_FILE = MEMORY_DIR / "short_term_memory.json"
+SHORT_TERM_FILE = MEMORY_DIR / "short_term_memory.json"  # Legacy shared file, read for migration only
 
 # Memory config
 SHORT_TERM_LIMIT = 10  # Last 10 conversation turns
+SHORT_TERM_COMPACT_LINES = 10 * SHORT_TERM_LIMIT  # Rewrite the JSONL log past this many lines
+SHORT_TERM_CONTEXT_CHARS = 4000  # Max characters of recent conversation put into a prompt
 LONG_TERM_SEARCH_LIMIT = 5  # Top 5 relevant memories
+LONG_TERM_BATCH_SIZE = 64  # Flush buffered long-term writes at this many items
+LONG_TERM_FLUSH_INTERVAL = 0.5  # ...or at most this many seconds after a write was buffered
+EMBEDDING_CACHE_SIZE = 4096  # Recently embedded texts kept in memory
+
+# HNSW graph parameters for the long-term collection.
+# M=16 / construction_ef=200 suits stores of hundreds to thousands of memories;
+# raise M to 32 for much larger stores. These two are fixed once the collection exists.
+# search_ef can be changed later: each doubling buys roughly +1-3% recall for
+# about linearly more query latency.
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+# Creation-only keys, which Chroma rejects in collection.modify()
+_HNSW_CREATION_KEYS = ("hnsw:space", "hnsw:M", "hnsw:construction_ef")
+
+
+@dataclass
+class ShortTermEntry:
+    """One conversation turn held in the short-term buffer"""
+    # Declared by hand (no field defaults) since dataclass(slots=True) needs Python 3.10
+    __slots__ = ("role", "content", "timestamp", "metadata")
+    role: str
+    content: str
+    timestamp: str
+    metadata: Dict
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ShortTermEntry":
+        return cls(data["role"], data["content"], data.get("timestamp", ""), data.get("metadata") or {})
+    
+    def to_dict(self) -> Dict:
+        return {
+            "role": self.role,
+            "content": self.content,
+            "timestamp": self.timestamp,
+            "metadata": self.metadata
+        }
+
+
+def _json_line(entry: ShortTermEntry) -> str:
+    """Serialize one short-term entry as a compact JSONL line"""
+    if HAS_ORJSON:
+        # orjson serializes dataclasses natively, slots included
+        return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE).decode()
+    return json.dumps(entry.to_dict(), separators=(',', ':')) + "\n"
+
+
+_json_loads = orjson.loads if HAS_ORJSON else json.loads
+
+
+# Short-term log writes happen on a background thread, in the order they were queued.
+# Items are (path, mode, text): mode 'a' appends text, 'w' atomically replaces the file.
+_WRITE_QUEUE: "queue.Queue[tuple]" = queue.Queue()
+_WRITE_BATCH_WINDOW = 0.05  # Seconds to wait for more writes before hitting the disk
+_writer_thread: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+
+def _apply_writes(batch: List[tuple]):
+    """Perform queued writes, coalescing consecutive appends to the same file"""
+    append_path, chunks = None, []
+    
+    def flush_appends():
+        if chunks:
+            with open(append_path, 'a', encoding='utf-8') as f:
+                f.write("".join(chunks))
+            chunks.clear()
+    
+    for path, mode, text in batch:
+        if mode == 'a' and path == append_path:
+            chunks.append(text)
+            continue
+        
+        flush_appends()
+        if mode == 'a':
+            append_path = path
+            chunks.append(text)
+        else:
+            append_path = None
+            tmp_file = path.with_suffix(path.suffix + ".tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_file, path)
+    
+    flush_appends()
+
+
+def _short_term_writer():
+    while True:
+        batch = [_WRITE_QUEUE.get()]
+        try:
+            while True:
+                batch.append(_WRITE_QUEUE.get(timeout=_WRITE_BATCH_WINDOW))
+        except queue.Empty:
+            pass
+        
+        try:
+            _apply_writes(batch)
+        except Exception as e:
+            print(f"Error saving short-term memory: {e}")
+        finally:
+            for _ in batch:
+                _WRITE_QUEUE.task_done()
+
+
+def _enqueue_write(path: Path, mode: str, text: str):
+    global _writer_thread
+    if _writer_thread is None:
+        with _writer_lock:
+            if _writer_thread is None:
+                _writer_thread = threading.Thread(target=_short_term_writer, daemon=True)
+                _writer_thread.start()
+    _WRITE_QUEUE.put((path, mode, text))
+
+
+def flush_short_term():
+    """Block until every queued short-term write has reached the disk"""
+    _WRITE_QUEUE.join()
+
+
+atexit.register(flush_short_term)
+
+
+# Long-term queries (embed + HNSW search) run here so short-term reads overlap with them.
+# Worker threads are only started on first use.
+_RECALL_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-recall")
+
+
+def _cuda_available() -> bool:
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+@functools.lru_cache(maxsize=1)
+def _get_embedding_fn():
+    """
+    Load the all-MiniLM-L6-v2 embedder once and share it across managers
+    
+    On a GPU the sentence-transformers model runs in FP16. On CPU, Chroma's
+    bundled ONNX Runtime export of the same model is used instead of torch;
+    both produce normalized vectors, so existing memories stay comparable.
+    """
+    if _cuda_available():
+        embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name="all-MiniLM-L6-v2",
+            device="cuda"
+        )
+        model = getattr(embedding_fn, "_model", None)
+        if model is not None:
+            model.half()
+        return embedding_fn
+    
+    return embedding_functions.ONNXMiniLM_L6_V2(preferred_providers=["CPUExecutionProvider"])
+
+
+def _value_hash(value: str) -> str:
+    """Short content hash stored with each long-term memory to detect unchanged values"""
+    return hashlib.blake2b(value.encode(), digest_size=8).hexdigest()
+
+
+def _short_term_path(conversation_id: str) -> Path:
+    """Short-term log for a conversation, kept inside MEMORY_DIR whatever the ID contains"""
+    safe_id = re.sub(r'[^\w-]', '_', conversation_id)
+    if safe_id != conversation_id:
+        # Distinct raw IDs must not collapse onto the same sanitized file
+        safe_id += "_" + hashlib.blake2b(conversation_id.encode(), digest_size=4).hexdigest()
+    return MEMORY_DIR / f"short_term_{safe_id}.jsonl"
+
+
+def _normalize_category(category: str) -> str:
+    """Keep categories short and case-insensitive so equality filters match"""
+    return category.strip().lower()[:32]
+
+
+class _EmbeddingCache:
+    """LRU of text -> embedding in front of an embedding function, keyed by content hash"""
+    
+    def __init__(self, embedding_fn, maxsize: int = EMBEDDING_CACHE_SIZE):
+        self.embedding_fn = embedding_fn
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[bytes, object]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __call__(self, texts: List[str]) -> List:
+        digests = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in texts]
+        
+        with self._lock:
+            vectors = [self._cache.get(digest) for digest in digests]
+            for digest, vector in zip(digests, vectors):
+                if vector is not None:
+                    self._cache.move_to_end(digest)
+        
+        misses = {digest: text for digest, text, vector in zip(digests, texts, vectors) if vector is None}
+        if misses:
+            # All distinct cache misses go through the model in a single batch
+            computed = dict(zip(misses, self.embedding_fn(list(misses.values()))))
+            with self._lock:
+                self._cache.update(computed)
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+            vectors = [computed[digest] if vector is None else vector
+                       for digest, vector in zip(digests, vectors)]
+        
+        return vectors
+
+
+@functools.lru_cache(maxsize=1)
+def _get_embedding_cache() -> _EmbeddingCache:
+    return _EmbeddingCache(_get_embedding_fn())
+
+
+@dataclass
+class RecallResult:
+    """Retrieved memories; formatting is deferred until a caller needs text"""
+    __slots__ = ("short_term", "long_term")
+    short_term: List[Dict]
+    long_term: List[Dict]
+    
+    def __bool__(self) -> bool:
+        return bool(self.short_term or self.long_term)
+    
+    def format(self) -> str:
+        """Render for the recall_memory tool response"""
+        sections = []
+        if self.short_term:
+            sections.append("📝 Recent Conversation:\n" + "\n".join(
+                f"  {msg['role']}: {msg['content'][:100]}..." for msg in self.short_term
+            ))
+        if self.long_term:
+            sections.append("\n🧠 Relevant Long-term Memories:\n" + "\n".join(
+                f"  [{mem['category']}] {mem['content']}\n    (Relevance: {mem['relevance_score']:.2%})"
+                for mem in self.long_term
+            ))
+        return "\n".join(sections) if sections else "No relevant memories found"
+    
+    def format_for_prompt(self) -> str:
+        """Render as context for an LLM prompt"""
+        sections = []
+        if self.short_term:
+            sections.append("=== Recent Conversation ===\n" + "\n".join(
+                f"{msg['role'].capitalize()}: {msg['content']}" for msg in self.short_term
+            ))
+        if self.long_term:
+            sections.append("\n=== Relevant Information ===\n" + "\n".join(
+                f"[{mem['category']}] {mem['content']}" for mem in self.long_term
+            ))
+        return "\n".join(sections)
 
 
 class MemoryManager:
     """Manage short-term and long-term memory"""
     
+    __slots__ = (
+        "conversation_id",
+        "short_term_file",
+        "_short_term_lines",
+        "short_term_buffer",
+        "_client",
+        "_long_term_collection",
+        "_pending_long_term",
+        "_long_term_lock",
+        "_last_long_term_flush",
+        "_flush_timer"
+    )
+    
     def __init__(self, conversation_id: str = "default"):
         """
         Initialize memory manager
@@ -36,62 +318,143 @@ class MemoryManager:
         
         # Create directories
         MEMORY_DIR.mkdir(parents=True, exist_ok=True)
-        CHROMA_DIR.mkdir(parents=True, exist_ok=True)
         
-        # Initialize short-term memory (in-memory buffer)
+        # Initialize short-term memory (in-memory buffer backed by an append-only log)
+        self.short_term_file = _short_term_path(conversation_id)
+        self._short_term_lines = 0
         self.short_term_buffer = deque(maxlen=SHORT_TERM_LIMIT)
         self._load_short_term()
         
-        # Initialize ChromaDB for long-term memory
-        self.client = chromadb.PersistentClient(
-            path=str(CHROMA_DIR),
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
-        )
+        # ChromaDB is opened on first long-term access, so short-term-only
+        # callers never pay for it
+        self._client = None
+        self._long_term_collection = None
         
-        # Use sentence transformers for embeddings
-        self.embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
-        )
-        
-        # Get or create long-term memory collection
-        self.long_term_collection = self.client.get_or_create_collection(
-            name="long_term_memory",
-            embedding_function=self.embedding_fn,
-            metadata={"description": "Persistent agent memory"}
-        )
+        # Buffered long-term writes, keyed by memory key
+        self._pending_long_term: Dict[str, tuple] = {}
+        self._long_term_lock = threading.RLock()
+        self._last_long_term_flush = time.monotonic()
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush_long_term)
     
-    def _load_short_term(self):
-        """Load short-term memory from disk"""
-        if SHORT_TERM_FILE.exists():
+    @property
+    def client(self):
+        """ChromaDB client for long-term memory, created on first use"""
+        if self._client is None:
+            with self._long_term_lock:
+                if self._client is None:
+                    CHROMA_DIR.mkdir(parents=True, exist_ok=True)
+                    self._client = chromadb.PersistentClient(
+                        path=str(CHROMA_DIR),
+                        settings=Settings(
+                            anonymized_telemetry=False,
+                            allow_reset=True
+                        )
+                    )
+        return self._client
+    
+    @property
+    def embedding_fn(self):
+        """Sentence embedding function (one model shared per process, loaded on first use)"""
+        return _get_embedding_fn()
+    
+    @property
+    def long_term_collection(self):
+        """Long-term memory collection, opened on first use"""
+        if self._long_term_collection is None:
+            with self._long_term_lock:
+                if self._long_term_collection is None:
+                    self._long_term_collection = self._open_long_term_collection()
+        return self._long_term_collection
+    
+    def _open_long_term_collection(self):
+        """
+        Get or create the long-term memory collection
+        
+        Graph settings only apply at creation time, so an existing collection
+        just has its search_ef brought up to date. Every write and query passes
+        explicit embeddings, so no embedding function is attached; that keeps
+        collections built with a different function openable.
+        """
+        try:
+            collection = self.client.get_collection(
+                name="long_term_memory",
+                embedding_function=None
+            )
+        except Exception:
+            return self.client.get_or_create_collection(
+                name="long_term_memory",
+                embedding_function=None,
+                metadata={
+                    "description": "Persistent agent memory",
+                    "hnsw:space": "cosine",
+                    "hnsw:M": HNSW_M,
+                    "hnsw:construction_ef": HNSW_EF_CONSTRUCTION,
+                    "hnsw:search_ef": HNSW_EF_SEARCH
+                }
+            )
+        
+        metadata = collection.metadata or {}
+        if metadata.get("hnsw:search_ef") != HNSW_EF_SEARCH:
+            mutable = {key: value for key, value in metadata.items() if key not in _HNSW_CREATION_KEYS}
             try:
-                with open(SHORT_TERM_FILE, 'r') as f:
-                    data = json.load(f)
-                    if self.conversation_id in data:
-                        memories = data[self.conversation_id]
-                        self.short_term_buffer = deque(memories, maxlen=SHORT_TERM_LIMIT)
+                collection.modify(metadata={**mutable, "hnsw:search_ef": HNSW_EF_SEARCH})
             except Exception as e:
-                print(f"Error loading short-term memory: {e}")
+                print(f"⚠️ Could not update long-term memory search_ef to {HNSW_EF_SEARCH} "
+                      f"(still {metadata.get('hnsw:search_ef', 'default')}): {e}")
+        return collection
     
-    def _save_short_term(self):
-        """Save short-term memory to disk"""
+    def _load_short_term(self):
+        """Load the last SHORT_TERM_LIMIT turns from this conversation's JSONL log"""
+        flush_short_term()
+        if not self.short_term_file.exists():
+            self._migrate_legacy_short_term()
+            return
+        
         try:
-            # Load existing data
-            data = {}
-            if SHORT_TERM_FILE.exists():
-                with open(SHORT_TERM_FILE, 'r') as f:
-                    data = json.load(f)
-            
-            # Update this conversation
-            data[self.conversation_id] = list(self.short_term_buffer)
-            
-            # Save
-            with open(SHORT_TERM_FILE, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Binary mode: lines skipped over are never decoded, and both orjson
+            # and json parse UTF-8 bytes directly
+            with open(self.short_term_file, 'rb') as f:
+                line_count = 0
+                tail = deque(maxlen=SHORT_TERM_LIMIT)
+                for line in f:
+                    line_count += 1
+                    tail.append(line)
+            self._short_term_lines = line_count
+            self.short_term_buffer = deque(
+                (ShortTermEntry.from_dict(_json_loads(line)) for line in tail if line.strip()),
+                maxlen=SHORT_TERM_LIMIT
+            )
         except Exception as e:
-            print(f"Error saving short-term memory: {e}")
+            print(f"Error loading short-term memory: {e}")
+    
+    def _migrate_legacy_short_term(self):
+        """Import this conversation from the old shared short_term_memory.json"""
+        if not SHORT_TERM_FILE.exists():
+            return
+        try:
+            data = _json_loads(SHORT_TERM_FILE.read_bytes())
+            if self.conversation_id in data:
+                self.short_term_buffer = deque(
+                    map(ShortTermEntry.from_dict, data[self.conversation_id]),
+                    maxlen=SHORT_TERM_LIMIT
+                )
+                self._compact_short_term()
+        except Exception as e:
+            print(f"Error loading short-term memory: {e}")
+    
+    def _save_short_term(self, entry: ShortTermEntry):
+        """Queue one turn for appending to the JSONL log, compacting it once it grows past the limit"""
+        _enqueue_write(self.short_term_file, 'a', _json_line(entry))
+        self._short_term_lines += 1
+        
+        if self._short_term_lines > SHORT_TERM_COMPACT_LINES:
+            self._compact_short_term()
+    
+    def _compact_short_term(self):
+        """Queue a rewrite of the JSONL log with just the turns currently in the buffer"""
+        _enqueue_write(self.short_term_file, 'w', "".join(map(_json_line, self.short_term_buffer)))
+        self._short_term_lines = len(self.short_term_buffer)
     
     def add_to_short_term(self, role: str, content: str, metadata: Optional[Dict] = None):
         """
@@ -102,15 +465,15 @@ class MemoryManager:
             content: Message content
             metadata: Optional metadata (e.g., parsed trade, timestamp)
         """
-        memory_entry = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            "metadata": metadata or {}
-        }
+        memory_entry = ShortTermEntry(
+            role,
+            content,
+            datetime.now().isoformat(timespec="seconds"),
+            metadata or {}
+        )
         
         self.short_term_buffer.append(memory_entry)
-        self._save_short_term()
+        self._save_short_term(memory_entry)
     
     def get_short_term(self, limit: Optional[int] = None) -> List[Dict]:
         """
@@ -123,13 +486,41 @@ class MemoryManager:
             List of recent messages
         """
         if limit:
-            return list(self.short_term_buffer)[-limit:]
-        return list(self.short_term_buffer)
+            start = max(0, len(self.short_term_buffer) - limit)
+            return [entry.to_dict() for entry in itertools.islice(self.short_term_buffer, start, None)]
+        return [entry.to_dict() for entry in self.short_term_buffer]
+    
+    def get_short_term_by_chars(
+        self,
+        budget: int = SHORT_TERM_CONTEXT_CHARS,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Get the most recent messages whose combined content fits in budget characters
+        
+        The newest message is always included, even if it alone exceeds the budget.
+        
+        Args:
+            budget: Max total characters of message content
+            limit: Max messages to return (default: no count limit)
+        
+        Returns:
+            List of recent messages, oldest first
+        """
+        messages = []
+        used = 0
+        for entry in itertools.islice(reversed(self.short_term_buffer), limit):
+            used += len(entry.content)
+            if messages and used > budget:
+                break
+            messages.append(entry.to_dict())
+        messages.reverse()
+        return messages
     
     def clear_short_term(self):
         """Clear short-term conversation buffer"""
         self.short_term_buffer.clear()
-        self._save_short_term()
+        self._compact_short_term()
     
     def add_to_long_term(
         self,
@@ -141,42 +532,100 @@ class MemoryManager:
         """
         Add important information to long-term memory
         
+        Writes are buffered and sent to Chroma in batches, at the latest
+        LONG_TERM_FLUSH_INTERVAL seconds later; reads through this manager flush
+        the buffer first, so they always see earlier adds.
+        
         Args:
             key: Unique identifier (e.g., "client_preferences_john_smith")
             value: Information to remember
             category: Memory category (e.g., "client_info", "compliance", "preferences")
             importance: Importance score 0-1 (for future prioritization)
         """
-        try:
-            # Create metadata
-            metadata = {
-                "key": key,
-                "category": category,
-                "importance": importance,
-                "timestamp": datetime.now().isoformat(),
-                "conversation_id": self.conversation_id
-            }
-            
-            # Check if already exists
-            existing = self.long_term_collection.get(ids=[key])
+        self.add_many_to_long_term([(key, value, category, importance)])
+    
+    def add_many_to_long_term(self, items: List[tuple]):
+        """
+        Buffer several long-term memories at once
+        
+        Args:
+            items: (key, value, category, importance) tuples
+        """
+        timestamp = datetime.now().isoformat()
+        with self._long_term_lock:
+            for key, value, category, importance in items:
+                self._pending_long_term[key] = (value, {
+                    "key": key,
+                    "category": _normalize_category(category),
+                    "importance": importance,
+                    "timestamp": timestamp,
+                    "conversation_id": self.conversation_id,
+                    "value_hash": _value_hash(value)
+                })
             
-            if existing['ids']:
-                # Update existing
-                self.long_term_collection.update(
-                    ids=[key],
-                    documents=[value],
-                    metadatas=[metadata]
-                )
-            else:
-                # Add new
-                self.long_term_collection.add(
-                    ids=[key],
-                    documents=[value],
-                    metadatas=[metadata]
-                )
+            due = (len(self._pending_long_term) >= LONG_TERM_BATCH_SIZE
+                   or time.monotonic() - self._last_long_term_flush >= LONG_TERM_FLUSH_INTERVAL)
         
-        except Exception as e:
-            print(f"Error adding to long-term memory: {e}")
+        if due:
+            self.flush_long_term()
+        else:
+            self._schedule_long_term_flush()
+    
+    def _schedule_long_term_flush(self):
+        """Flush the buffer after LONG_TERM_FLUSH_INTERVAL even if no further add arrives"""
+        with self._long_term_lock:
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(LONG_TERM_FLUSH_INTERVAL, self.flush_long_term)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def _embed(self, texts: List[str]) -> List:
+        """Embed texts via the shared LRU cache; misses go through the model in one batch"""
+        return _get_embedding_cache()(texts)
+    
+    def flush_long_term(self):
+        """
+        Send buffered long-term memories to Chroma
+        
+        Memories whose stored value_hash matches are unchanged, so only their
+        metadata is updated; everything else is embedded and upserted in one batch.
+        """
+        with self._long_term_lock:
+            self._last_long_term_flush = time.monotonic()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending_long_term:
+                return
+            pending, self._pending_long_term = self._pending_long_term, {}
+            
+            try:
+                existing = self.long_term_collection.get(ids=list(pending), include=["metadatas"])
+                stored_hashes = {
+                    key: (meta or {}).get("value_hash")
+                    for key, meta in zip(existing['ids'], existing['metadatas'])
+                }
+                
+                unchanged, changed = [], []
+                for key, (_, meta) in pending.items():
+                    (unchanged if stored_hashes.get(key) == meta["value_hash"] else changed).append(key)
+                
+                if unchanged:
+                    self.long_term_collection.update(
+                        ids=unchanged,
+                        metadatas=[pending[key][1] for key in unchanged]
+                    )
+                if changed:
+                    documents = [pending[key][0] for key in changed]
+                    self.long_term_collection.upsert(
+                        ids=changed,
+                        documents=documents,
+                        embeddings=self._embed(documents),
+                        metadatas=[pending[key][1] for key in changed]
+                    )
+            
+            except Exception as e:
+                print(f"Error adding to long-term memory: {e}")
     
     def query_long_term(
         self,
@@ -195,32 +644,45 @@ class MemoryManager:
         Returns:
             List of relevant memories
         """
+        self.flush_long_term()
+        
         try:
             # Build filter
             where_filter = None
             if category:
-                where_filter = {"category": category}
+                where_filter = {"category": _normalize_category(category)}
+            
+            # Skip embedding the query when nothing could match. The collection is
+            # shared by every conversation (and process), so count it fresh each time
+            stored = self.long_term_collection.count()
+            if stored == 0:
+                return []
+            if where_filter and not self.long_term_collection.get(where=where_filter, limit=1, include=[])['ids']:
+                return []
             
             # Query
             results = self.long_term_collection.query(
-                query_texts=[query],
-                n_results=limit,
+                query_embeddings=self._embed([query]),
+                n_results=min(limit, stored),
                 where=where_filter
             )
             
             # Format results
-            memories = []
-            if results['ids'] and len(results['ids'][0]) > 0:
-                for i in range(len(results['ids'][0])):
-                    memory = {
-                        "key": results['metadatas'][0][i]['key'],
-                        "content": results['documents'][0][i],
-                        "category": results['metadatas'][0][i]['category'],
-                        "importance": results['metadatas'][0][i]['importance'],
-                        "timestamp": results['metadatas'][0][i]['timestamp'],
-                        "relevance_score": 1.0 - results['distances'][0][i]
-                    }
-                    memories.append(memory)
+            if not results['ids'] or not results['ids'][0]:
+                return []
+            
+            docs, metas, dists = results['documents'][0], results['metadatas'][0], results['distances'][0]
+            memories = [
+                {
+                    "key": meta['key'],
+                    "content": doc,
+                    "category": meta['category'],
+                    "importance": meta['importance'],
+                    "timestamp": meta['timestamp'],
+                    "relevance_score": 1.0 - dist
+                }
+                for doc, meta, dist in zip(docs, metas, dists)
+            ]
             
             return memories
         
@@ -230,6 +692,8 @@ class MemoryManager:
     
     def get_by_key(self, key: str) -> Optional[Dict]:
         """Get specific memory by key"""
+        self.flush_long_term()
+        
         try:
             result = self.long_term_collection.get(ids=[key])
             
@@ -249,6 +713,8 @@ class MemoryManager:
     
     def delete_memory(self, key: str):
         """Delete a specific memory"""
+        self.flush_long_term()
+        
         try:
             self.long_term_collection.delete(ids=[key])
         except Exception as e:
@@ -256,21 +722,22 @@ class MemoryManager:
     
     def get_all_long_term(self, category: Optional[str] = None) -> List[Dict]:
         """Get all long-term memories, optionally filtered by category"""
+        self.flush_long_term()
+        
         try:
-            where_filter = {"category": category} if category else None
+            where_filter = {"category": _normalize_category(category)} if category else None
             results = self.long_term_collection.get(where=where_filter)
             
-            memories = []
-            if results['ids']:
-                for i in range(len(results['ids'])):
-                    memory = {
-                        "key": results['ids'][i],
-                        "content": results['documents'][i],
-                        "category": results['metadatas'][i]['category'],
-                        "importance": results['metadatas'][i]['importance'],
-                        "timestamp": results['metadatas'][i]['timestamp']
-                    }
-                    memories.append(memory)
+            memories = [
+                {
+                    "key": key,
+                    "content": doc,
+                    "category": meta['category'],
+                    "importance": meta['importance'],
+                    "timestamp": meta['timestamp']
+                }
+                for key, doc, meta in zip(results['ids'], results['documents'], results['metadatas'])
+            ]
             
             return memories
         
@@ -278,6 +745,34 @@ class MemoryManager:
             print(f"Error getting memories: {e}")
             return []
     
+    def recall(
+        self,
+        query: Optional[str],
+        memory_type: Literal["short", "long", "both"] = "both",
+        limit: int = 3
+    ) -> RecallResult:
+        """
+        Retrieve recent turns and relevant long-term memories without formatting them
+        
+        Args:
+            query: Query for long-term memories (skipped when empty)
+            memory_type: "short", "long", or "both"
+            limit: Max messages / memories of each kind
+        
+        Returns:
+            RecallResult with raw memory dicts
+        """
+        long_future = None
+        if query and memory_type in ("long", "both"):
+            long_future = _RECALL_EXECUTOR.submit(self.query_long_term, query, limit)
+        
+        result = RecallResult(short_term=[], long_term=[])
+        if memory_type in ("short", "both"):
+            result.short_term = self.get_short_term(limit=limit)
+        if long_future is not None:
+            result.long_term = long_future.result()
+        return result
+    
     def get_context_for_prompt(self, query: Optional[str] = None) -> str:
         """
         Get formatted memory context for LLM prompt
@@ -288,32 +783,35 @@ class MemoryManager:
         Returns:
             Formatted string with short-term + relevant long-term memories
         """
-        context_parts = []
-        
-        # Add short-term conversation history
-        short_term = self.get_short_term(limit=5)  # Last 5 turns
-        if short_term:
-            context_parts.append("=== Recent Conversation ===")
-            for msg in short_term:
-                role = msg['role'].capitalize()
-                context_parts.append(f"{role}: {msg['content']}")
-        
-        # Add relevant long-term memories
-        if query:
-            long_term = self.query_long_term(query, limit=3)
-            if long_term:
-                context_parts.append("\n=== Relevant Information ===")
-                for mem in long_term:
-                    context_parts.append(f"[{mem['category']}] {mem['content']}")
+        long_future = _RECALL_EXECUTOR.submit(self.query_long_term, query, 3) if query else None
+        short_term = self.get_short_term_by_chars(limit=5)  # Last 5 turns, within the char budget
         
-        return "\n".join(context_parts)
+        return RecallResult(
+            short_term=short_term,
+            long_term=long_future.result() if long_future is not None else []
+        ).format_for_prompt()
+
+
+_MANAGER_CACHE: Dict[str, MemoryManager] = {}
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_manager(conversation_id: str = "default") -> MemoryManager:
+    """Return the process-wide MemoryManager for a conversation, creating it on first use"""
+    manager = _MANAGER_CACHE.get(conversation_id)
+    if manager is None:
+        with _MANAGER_LOCK:
+            manager = _MANAGER_CACHE.get(conversation_id)
+            if manager is None:
+                manager = _MANAGER_CACHE[conversation_id] = MemoryManager(conversation_id)
+    return manager
 
 
 # Tool functions for agent
 def remember_short_term(role: str, content: str) -> str:
     """Add message to short-term conversation memory"""
     try:
-        manager = MemoryManager()
+        manager = get_manager()
         manager.add_to_short_term(role, content)
         return f"✅ Added to short-term memory"
     except Exception as e:
@@ -331,7 +829,7 @@ def remember_long_term(key: str, value: str, category: str = "general", importan
         importance: 0-1 score
     """
     try:
-        manager = MemoryManager()
+        manager = get_manager()
         manager.add_to_long_term(key, value, category, importance)
         return f"✅ Stored in long-term memory: {key}"
     except Exception as e:
@@ -347,27 +845,8 @@ def recall_memory(query: str, memory_type: Literal["short", "long", "both"] = "b
         memory_type: "short" (recent chat), "long" (persistent), or "both"
     """
     try:
-        manager = MemoryManager()
-        response = []
-        
-        # Short-term memory
-        if memory_type in ["short", "both"]:
-            short_term = manager.get_short_term(limit=5)
-            if short_term:
-                response.append("📝 Recent Conversation:")
-                for msg in short_term[-3:]:  # Last 3 messages
-                    response.append(f"  {msg['role']}: {msg['content'][:100]}...")
-        
-        # Long-term memory
-        if memory_type in ["long", "both"]:
-            long_term = manager.query_long_term(query, limit=3)
-            if long_term:
-                response.append("\n🧠 Relevant Long-term Memories:")
-                for mem in long_term:
-                    response.append(f"  [{mem['category']}] {mem['content']}")
-                    response.append(f"    (Relevance: {mem['relevance_score']:.2%})")
-        
-        return "\n".join(response) if response else "No relevant memories found"
+        manager = get_manager()
+        return manager.recall(query, memory_type).format()
     
     except Exception as e:
         return f"❌ Error: {str(e)}"
@@ -376,7 +855,7 @@ def recall_memory(query: str, memory_type: Literal["short", "long", "both"] = "b
 def forget_memory(key: str) -> str:
     """Delete a specific long-term memory"""
     try:
-        manager = MemoryManager()
+        manager = get_manager()
         manager.delete_memory(key)
         return f"✅ Deleted memory: {key}"
     except Exception as e:
@@ -386,7 +865,7 @@ def forget_memory(key: str) -> str:
 def clear_conversation() -> str:
     """Clear short-term conversation history"""
     try:
-        manager = MemoryManager()
+        manager = get_manager()
         manager.clear_short_term()
         return "✅ Conversation history cleared"
     except Exception as e:
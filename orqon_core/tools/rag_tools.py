@@ -2,21 +2,221 @@
 RAG Tools with ChromaDB
 Query historical trade data using semantic search
 """
+import functools
+import hashlib
+import importlib.util
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import numpy as np
 import pandas as pd
 import chromadb
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
 from chromadb.config import Settings
-from chromadb.utils import embedding_functions
 from pathlib import Path
 from typing import List, Dict, Optional
-from datetime import datetime
 import json
 
+# Lets pandas use the much faster calamine Excel engine; only its presence matters here
+HAS_CALAMINE = importlib.util.find_spec("python_calamine") is not None
+
+try:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    HAS_TEXT_SPLITTER = True
+except ImportError:
+    HAS_TEXT_SPLITTER = False
+
+try:
+    from model2vec import StaticModel
+    HAS_MODEL2VEC = True
+except ImportError:
+    HAS_MODEL2VEC = False
+
 # Paths
 DATA_DIR = Path(__file__).parent.parent / "data"
 EXCEL_FILE = DATA_DIR / "trade_blotter.xlsx"
 CSV_FILE = DATA_DIR / "trade_blotter.csv"
 CHROMA_DIR = DATA_DIR / "chroma_db"
 
+# Embedding model: all-MiniLM-L6-v2, fast and accurate for short texts.
+# Its Hugging Face repo ships an int8-quantized ONNX export tuned for AVX512-VNNI.
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+ONNX_INT8_MODEL_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+# Opt-in model2vec static embeddings (a token lookup table distilled from a
+# transformer, no forward pass). They live in a different vector space, so
+# they get their own collections and are indexed from scratch.
+STATIC_EMBEDDING_MODEL = "minishlab/potion-base-8M"
+USE_STATIC_EMBEDDINGS = HAS_MODEL2VEC and os.getenv("ORQON_STATIC_EMBEDDINGS", "").lower() in ("1", "true", "yes")
+_COLLECTION_SUFFIX = "_static" if USE_STATIC_EMBEDDINGS else ""
+TRADE_COLLECTION = "trade_history" + _COLLECTION_SUFFIX
+KB_COLLECTION = "compliance_knowledge" + _COLLECTION_SUFFIX
+
+# Knowledge base source documents and their id prefixes
+KB_DOCS_DIR = DATA_DIR.parent / "docs"
+KB_DOCUMENTS = (
+    ("compliance_guidelines.txt", "compliance"),
+    ("risk_assessment_rules.txt", "risk"),
+    ("trading_procedures.txt", "procedure"),
+)
+
+# Knowledge base chunks of ~400 characters (~100 tokens) stay well inside
+# MiniLM's 256-token window, so nothing embedded is silently truncated
+KB_CHUNK_SIZE = 400
+KB_CHUNK_OVERLAP = 40
+
+# Embeddings are unit-normalized, so new collections use cosine distance
+# (relevance_score = 1 - distance is then the cosine similarity)
+HNSW_SETTINGS = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 100
+}
+
+EMBED_BATCH_SIZE = 64  # Texts per model forward pass
+INDEX_BATCH_SIZE = 250  # Trades per collection.add call when indexing
+INDEX_RESULT_TIMEOUT = 30  # Seconds index_all_trades waits for the background run's outcome
+
+# Metadata fields whose equality filters are resolved to ticket IDs in pandas,
+# and the most IDs passed to Chroma as an $in filter
+FILTER_FIELDS = ("ticker", "client_name", "solicited")
+MAX_FILTER_IDS = 2000
+
+_NO_MATCH = object()  # Filter that no trade satisfies
+
+
+class _SentenceTransformerEF(EmbeddingFunction[Documents]):
+    """Chroma embedding function over an already loaded SentenceTransformer"""
+    
+    def __init__(self, model, batch_size: int = EMBED_BATCH_SIZE):
+        self.model = model
+        self.batch_size = batch_size
+    
+    def __call__(self, input: Documents) -> Embeddings:
+        return self.model.encode(
+            list(input),
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        ).tolist()
+
+
+class _StaticModelEF(EmbeddingFunction[Documents]):
+    """Chroma embedding function over a model2vec StaticModel"""
+    
+    def __init__(self, model):
+        self.model = model
+    
+    def __call__(self, input: Documents) -> Embeddings:
+        embeddings = self.model.encode(list(input))
+        return (embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True).clip(min=1e-12)).tolist()
+
+
+def _ort_session_options():
+    """ONNX Runtime settings for the embedder's single long-lived inference session"""
+    import onnxruntime as ort
+    
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL  # fuse LayerNorm/GELU/attention
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.enable_cpu_mem_arena = True  # reuse buffers across calls
+    options.add_session_config_entry("session.intra_op.allow_spinning", "1")
+    return options
+
+
+@functools.lru_cache(maxsize=1)
+def _get_embedding_fn():
+    """
+    Load the embedder once per process
+    
+    Prefers the int8 ONNX Runtime export of the model (sentence-transformers>=3.2
+    with optimum[onnxruntime]) and falls back to the PyTorch model. With
+    ORQON_STATIC_EMBEDDINGS set and model2vec installed, a static model is used instead.
+    """
+    if USE_STATIC_EMBEDDINGS:
+        return _StaticModelEF(StaticModel.from_pretrained(STATIC_EMBEDDING_MODEL))
+    
+    from sentence_transformers import SentenceTransformer
+    
+    try:
+        model = SentenceTransformer(
+            EMBEDDING_MODEL,
+            backend="onnx",
+            model_kwargs={
+                "file_name": ONNX_INT8_MODEL_FILE,
+                "provider": "CPUExecutionProvider",
+                "session_options": _ort_session_options()
+            }
+        )
+    except Exception as e:
+        print(f"ONNX int8 embedder unavailable, using PyTorch: {e}")
+        model = SentenceTransformer(EMBEDDING_MODEL)
+    return _SentenceTransformerEF(model)
+
+
+@functools.lru_cache(maxsize=1024)
+def _embed_query(text: str) -> tuple:
+    """Embedding of a query string, cached since agents often repeat the same queries"""
+    return tuple(_get_embedding_fn()([text])[0])
+
+
+_FMT = '{:.2f}'.format  # Price formatter, bound once
+
+# Metadata fields copied into each trade result
+_RESULT_FIELDS = (
+    "ticket_id", "client_name", "ticker", "side", "quantity",
+    "price", "order_type", "solicited", "timestamp"
+)
+
+
+def _trade_result(meta: Dict, description: str, relevance_score: float) -> Dict:
+    """Shape one Chroma hit as a trade result dict"""
+    result = {field: meta[field] for field in _RESULT_FIELDS}
+    result["description"] = description
+    result["relevance_score"] = relevance_score
+    return result
+
+
+# Indexing runs on a single background worker, keeping Chroma's SQLite writes serial
+_INDEX_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trade-index")
+
+
+def _report_index_result(future: Future):
+    try:
+        result = future.result()
+        print(f"Trade indexing: {result['message']}")
+    except Exception as e:
+        print(f"Error indexing trades: {e}")
+
+
+def _open_collection(client, name: str, description: str):
+    """
+    Open a collection, creating it with HNSW_SETTINGS if it doesn't exist yet
+    
+    Distance space and graph parameters are fixed at creation, so an existing
+    collection is opened as-is.
+    """
+    embedding_fn = _get_embedding_fn()
+    try:
+        return client.get_collection(name=name, embedding_function=embedding_fn)
+    except Exception:
+        return client.get_or_create_collection(
+            name=name,
+            embedding_function=embedding_fn,
+            metadata={"description": description, **HNSW_SETTINGS}
+        )
+
+
+@functools.lru_cache(maxsize=2)
+def _read_trades(path: str, mtime: float) -> pd.DataFrame:
+    """Parse a trade blotter file; mtime is part of the cache key so edits are picked up"""
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+    return pd.read_excel(path, engine='calamine' if HAS_CALAMINE else None)
+
 
 class TradeRAG:
     """RAG system for querying historical trade data"""
@@ -35,93 +235,178 @@ class TradeRAG:
             )
         )
         
-        # Use sentence transformers for embeddings
-        # Using all-MiniLM-L6-v2: fast and accurate for short texts
-        self.embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
-        )
+        # Use sentence transformers for embeddings (int8 ONNX when available)
+        self.embedding_fn = _get_embedding_fn()
         
         # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name="trade_history",
-            embedding_function=self.embedding_fn,
-            metadata={"description": "Trade blotter historical data"}
-        )
+        self.collection = _open_collection(self.client, TRADE_COLLECTION, "Trade blotter historical data")
+        
+        # Blotter columns used to resolve metadata filters in pandas
+        self._filter_source = None
+        self._filter_cache = None
+        
+        self._index_lock = threading.Lock()
     
     def _load_trades(self) -> pd.DataFrame:
-        """Load trades from Excel or CSV"""
-        if EXCEL_FILE.exists():
-            return pd.read_excel(EXCEL_FILE)
-        elif CSV_FILE.exists():
-            return pd.read_csv(CSV_FILE)
+        """
+        Load trades from Excel or CSV
+        
+        The CSV is preferred whenever it is at least as new as the workbook, since
+        it parses much faster. The returned DataFrame is cached per file
+        modification time and shared, so callers must not modify it.
+        """
+        excel_mtime = EXCEL_FILE.stat().st_mtime if EXCEL_FILE.exists() else None
+        csv_mtime = CSV_FILE.stat().st_mtime if CSV_FILE.exists() else None
+        
+        if csv_mtime is not None and (excel_mtime is None or csv_mtime >= excel_mtime):
+            return _read_trades(str(CSV_FILE), csv_mtime)
+        elif excel_mtime is not None:
+            return _read_trades(str(EXCEL_FILE), excel_mtime)
         else:
             return pd.DataFrame()
     
-    def _create_trade_text(self, row: pd.Series) -> str:
+    @staticmethod
+    def _column(df: pd.DataFrame, names: tuple, default) -> pd.Series:
+        """First of the column aliases present in df with blanks filled, else a constant column"""
+        for name in names:
+            if name in df.columns:
+                return df[name] if default is None else df[name].fillna(default)
+        return pd.Series(default, index=df.index)
+    
+    def _trade_metadata(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Typed metadata columns for every trade (ChromaDB can store rich metadata)"""
+        ticket_id = self._column(df, ('Ticket_ID', 'TicketID'), None)
+        ticket_id = ticket_id.where(ticket_id.notna(), 'TKT-' + df.index.astype(str).to_series(index=df.index))
+        quantity = self._column(df, ('Quantity', 'Qty'), 0)
+        price = self._column(df, ('Price',), 0.0)
+        solicited = self._column(df, ('Solicited',), 'No')
+        
+        return pd.DataFrame({
+            "ticket_id": ticket_id.astype(str),
+            "timestamp": self._column(df, ('Timestamp',), '').astype(str),
+            "client_name": self._column(df, ('Client_Name', 'Client'), 'Unknown').astype(str),
+            "ticker": self._column(df, ('Ticker',), 'UNKNOWN').astype(str),
+            "side": self._column(df, ('Side',), 'Unknown').astype(str),
+            "quantity": pd.to_numeric(quantity, errors='coerce').fillna(0).astype('int64'),
+            "order_type": self._column(df, ('Order_Type', 'Type'), 'Unknown').astype(str),
+            "price": pd.to_numeric(price, errors='coerce').fillna(0.0).astype('float64'),
+            "solicited": solicited.astype(str).str.lower().isin(('yes', 'true', '1')) | (solicited == True),
+            "stage": self._column(df, ('Stage',), 'Pending').astype(str)
+        })
+    
+    def _filter_frame(self) -> pd.DataFrame:
         """
-        Create searchable text from trade data
-        Format: "Client [name] traded [quantity] shares of [ticker] ([side]) 
-                 on [date]. Order type: [order_type]. Solicited: [solicited]. 
-                 Notes: [notes]"
+        Ticket IDs plus the filterable columns, rebuilt only when the blotter changes
+        
+        Ticker and client name are categoricals, so equality filters compare
+        integer codes rather than strings.
         """
-        # Handle both column name formats
-        client = row.get('Client_Name', row.get('Client', 'Unknown'))
-        quantity = row.get('Quantity', row.get('Qty', 0))
-        ticker = row.get('Ticker', 'UNKNOWN')
-        side = row.get('Side', 'Unknown')
-        order_type = row.get('Order_Type', row.get('Type', 'Unknown'))
-        price = row.get('Price', 0.0)
-        solicited = row.get('Solicited', 'No')
-        notes = row.get('Notes', '')
-        email = row.get('Email', '')
-        timestamp = row.get('Timestamp', '')
-        
-        date = pd.to_datetime(timestamp).strftime('%Y-%m-%d %H:%M') if timestamp else 'Unknown date'
-        
-        text_parts = [
-            f"Client {client} traded {quantity} shares of {ticker} ({side})",
-            f"on {date}",
-            f"Order type: {order_type}",
-            f"Price: ${price:.2f}" if pd.notna(price) and price > 0 else "Market price",
-            f"Solicited: {solicited}",
-        ]
+        df = self._load_trades()
+        if df is not self._filter_source:
+            frame = None
+            if not df.empty:
+                frame = self._trade_metadata(df)[[*FILTER_FIELDS, 'ticket_id']].astype(
+                    {'ticker': 'category', 'client_name': 'category'}
+                )
+            self._filter_source, self._filter_cache = df, frame
+        return self._filter_cache
+    
+    def _filter_ids(self, filter_dict: Optional[Dict]) -> Optional[List[str]]:
+        """
+        Resolve a single equality filter on ticker, client_name or solicited to ticket IDs
         
-        if pd.notna(notes) and notes:
-            text_parts.append(f"Notes: {notes}")
+        Returns None when the filter has another shape or there is no blotter to
+        consult, in which case Chroma applies the filter itself.
+        """
+        if not filter_dict or len(filter_dict) != 1:
+            return None
+        (field, value), = filter_dict.items()
+        if field not in FILTER_FIELDS or isinstance(value, dict):
+            return None
+        
+        frame = self._filter_frame()
+        if frame is None:
+            return None
+        return frame.loc[frame[field] == value, 'ticket_id'].tolist()
+    
+    def _prepare_trades(self, df: pd.DataFrame) -> tuple:
+        """
+        Build documents, metadatas and ids for every trade with columnar operations
         
-        if pd.notna(email) and email:
-            text_parts.append(f"Email: {email}")
+        Document text: "Client [name] traded [quantity] shares of [ticker] ([side]).
+        on [date]. Order type: [order_type]. Price: $[price]. Solicited: [solicited]",
+        plus ". Notes: ..." / ". Email: ..." when present.
+        """
+        metadata_frame = self._trade_metadata(df)
+        quantity = self._column(df, ('Quantity', 'Qty'), 0)
+        price = metadata_frame['price']
+        
+        # Searchable text
+        dates = (
+            pd.to_datetime(self._column(df, ('Timestamp',), ''), errors='coerce', format='mixed')
+            .dt.strftime('%Y-%m-%d %H:%M')
+            .fillna('Unknown date')
+        )
+        price_text = ("Price: $" + price.map(_FMT)).where(price > 0, "Market price")
+        documents = (
+            "Client " + metadata_frame['client_name'] + " traded " + quantity.astype(str)
+            + " shares of " + metadata_frame['ticker']
+            + " (" + metadata_frame['side'] + "). on " + dates
+            + ". Order type: " + metadata_frame['order_type']
+            + ". " + price_text
+            + ". Solicited: " + self._column(df, ('Solicited',), 'No').astype(str)
+        )
+        for label, column in (("Notes", ('Notes',)), ("Email", ('Email',))):
+            column = self._column(df, column, '').astype(str)
+            documents = documents.where(column == '', documents + f". {label}: " + column)
+        documents = documents.tolist()
+        
+        # Content hash, so reindexing can tell which documents need new embeddings
+        metadata_frame['doc_hash'] = [
+            hashlib.blake2b(document.encode(), digest_size=8).hexdigest() for document in documents
+        ]
         
-        return ". ".join(text_parts)
+        # Use ticket ID as unique ID
+        return (
+            documents,
+            metadata_frame.to_dict(orient='records'),
+            metadata_frame['ticket_id'].tolist()
+        )
     
     def index_trades(self, force_reindex: bool = False) -> Dict:
         """
         Index all trades into ChromaDB
         
+        Runs are serialized, so a query that finds the collection empty while a
+        background run is in progress waits for it instead of indexing twice.
+        
         Args:
-            force_reindex: If True, delete existing collection and reindex
+            force_reindex: If True, re-sync the collection with the blotter even if it is already indexed
         
         Returns:
-            Dict with status and count
+            Dict with status, count and added/updated/skipped/deleted document counts
         """
+        with self._index_lock:
+            return self._index_trades(force_reindex)
+    
+    def index_trades_async(self, force_reindex: bool = False) -> Future:
+        """Schedule index_trades on the background indexing thread; the future resolves to its result dict"""
+        future = _INDEX_EXECUTOR.submit(self.index_trades, force_reindex)
+        future.add_done_callback(_report_index_result)
+        return future
+    
+    def _index_trades(self, force_reindex: bool) -> Dict:
         try:
             # Check if already indexed
             if not force_reindex and self.collection.count() > 0:
+                count = self.collection.count()
                 return {
                     "success": True,
-                    "message": f"Collection already indexed with {self.collection.count()} trades",
-                    "count": self.collection.count()
+                    "message": f"Collection already indexed with {count} trades",
+                    "count": count,
+                    "added": 0, "updated": 0, "skipped": count, "deleted": 0
                 }
             
-            # Reset collection if force reindex
-            if force_reindex:
-                self.client.delete_collection("trade_history")
-                self.collection = self.client.create_collection(
-                    name="trade_history",
-                    embedding_function=self.embedding_fn,
-                    metadata={"description": "Trade blotter historical data"}
-                )
-            
             # Load trades
             df = self._load_trades()
             
@@ -129,70 +414,68 @@ class TradeRAG:
                 return {
                     "success": False,
                     "message": "No trades found to index",
-                    "count": 0
+                    "count": 0,
+                    "added": 0, "updated": 0, "skipped": 0, "deleted": 0
                 }
             
-            # Prepare data for indexing
-            documents = []
-            metadatas = []
-            ids = []
+            # Prepare data for indexing (a repeated ticket ID keeps its last row)
+            documents, metadatas, ids = self._prepare_trades(df)
+            rows = list(dict(zip(ids, range(len(ids)))).values())
             
-            for idx, row in df.iterrows():
-                # Create searchable text
-                text = self._create_trade_text(row)
-                documents.append(text)
-                
-                # Handle both column formats
-                ticket_id = row.get('Ticket_ID', row.get('TicketID', f'TKT-{idx}'))
-                client_name = row.get('Client_Name', row.get('Client', 'Unknown'))
-                ticker = row.get('Ticker', 'UNKNOWN')
-                side = row.get('Side', 'Unknown')
-                quantity = row.get('Quantity', row.get('Qty', 0))
-                order_type = row.get('Order_Type', row.get('Type', 'Unknown'))
-                price = row.get('Price', 0.0)
-                solicited_val = row.get('Solicited', 'No')
-                stage = row.get('Stage', 'Pending')
-                timestamp = row.get('Timestamp', '')
-                
-                # Convert solicited to boolean
-                solicited_bool = solicited_val in ['Yes', True, 'yes', 'true', '1', 1]
-                
-                # Create metadata (ChromaDB can store rich metadata)
-                metadata = {
-                    "ticket_id": str(ticket_id),
-                    "timestamp": str(timestamp),
-                    "client_name": str(client_name),
-                    "ticker": str(ticker),
-                    "side": str(side),
-                    "quantity": int(quantity) if pd.notna(quantity) else 0,
-                    "order_type": str(order_type),
-                    "price": float(price) if pd.notna(price) else 0.0,
-                    "solicited": solicited_bool,
-                    "stage": str(stage) if pd.notna(stage) else 'Pending'
-                }
-                metadatas.append(metadata)
-                
-                # Use ticket ID as unique ID
-                ids.append(str(ticket_id))
+            # Diff against what is stored: only new or changed documents are
+            # embedded, metadata-only changes skip the model, and trades no longer
+            # in the blotter are removed
+            existing = self.collection.get(include=['metadatas'])
+            stored = dict(zip(existing['ids'], existing['metadatas']))
             
-            # Add to collection (batch operation)
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
+            changed, metadata_only = [], []
+            added = 0
+            for i in rows:
+                old = stored.pop(ids[i], None)
+                if old is None or old.get('doc_hash') != metadatas[i]['doc_hash']:
+                    changed.append(i)
+                    added += old is None
+                elif old != metadatas[i]:
+                    metadata_only.append(i)
             
+            deleted = len(stored)
+            if stored:
+                self.collection.delete(ids=list(stored))
+            
+            for start in range(0, len(metadata_only), INDEX_BATCH_SIZE):
+                batch = metadata_only[start:start + INDEX_BATCH_SIZE]
+                self.collection.update(
+                    ids=[ids[i] for i in batch],
+                    metadatas=[metadatas[i] for i in batch]
+                )
+            
+            # Embed in one batched pass, then upsert in fixed-size batches
+            embeddings = self.embedding_fn([documents[i] for i in changed]) if changed else []
+            for start in range(0, len(changed), INDEX_BATCH_SIZE):
+                batch = changed[start:start + INDEX_BATCH_SIZE]
+                self.collection.upsert(
+                    documents=[documents[i] for i in batch],
+                    embeddings=embeddings[start:start + INDEX_BATCH_SIZE],
+                    metadatas=[metadatas[i] for i in batch],
+                    ids=[ids[i] for i in batch]
+                )
+            
+            updated = len(changed) - added + len(metadata_only)
+            skipped = len(rows) - added - updated
             return {
                 "success": True,
-                "message": f"Successfully indexed {len(documents)} trades",
-                "count": len(documents)
+                "message": (f"Successfully indexed {len(rows)} trades "
+                            f"({added} added, {updated} updated, {skipped} unchanged, {deleted} removed)"),
+                "count": len(rows),
+                "added": added, "updated": updated, "skipped": skipped, "deleted": deleted
             }
         
         except Exception as e:
             return {
                 "success": False,
                 "message": f"Error indexing trades: {str(e)}",
-                "count": 0
+                "count": 0,
+                "added": 0, "updated": 0, "skipped": 0, "deleted": 0
             }
     
     def query(
@@ -217,34 +500,67 @@ class TradeRAG:
             if self.collection.count() == 0:
                 self.index_trades()
             
+            where_filter = self._resolve_filter(filter_dict)
+            if where_filter is _NO_MATCH:
+                return []
+            
             # Query ChromaDB
             results = self.collection.query(
-                query_texts=[query_text],
+                query_embeddings=[list(_embed_query(query_text))],
                 n_results=limit,
-                where=filter_dict  # Metadata filtering
+                where=where_filter,  # Metadata filtering
+                include=['metadatas', 'documents', 'distances']
             )
             
-            # Format results
-            formatted_results = []
+            # Format results (one query, so each field is a single inner list)
+            metas, docs, dists = results['metadatas'][0], results['documents'][0], results['distances'][0]
+            # Convert distance to score
+            return [_trade_result(meta, doc, 1.0 - dist) for meta, doc, dist in zip(metas, docs, dists)]
+        
+        except Exception as e:
+            print(f"Error querying: {e}")
+            return []
+    
+    def _resolve_filter(self, filter_dict: Optional[Dict]):
+        """
+        Turn filter_dict into a Chroma where clause
+        
+        Simple filters are resolved against the blotter in pandas: no match gives
+        _NO_MATCH (skip Chroma entirely), otherwise the candidate ticket IDs narrow
+        the search. The original condition is kept alongside them, since ticket IDs
+        are not unique and the index can lag the blotter.
+        """
+        ticket_ids = self._filter_ids(filter_dict)
+        if ticket_ids is None:
+            return filter_dict
+        if not ticket_ids:
+            return _NO_MATCH
+        if len(ticket_ids) <= MAX_FILTER_IDS:
+            return {"$and": [filter_dict, {"ticket_id": {"$in": ticket_ids}}]}
+        return filter_dict
+    
+    def _metadata_lookup(self, filter_dict: Dict, limit: int) -> List[Dict]:
+        """
+        Fetch trades matching a metadata filter, without embedding or vector search
+        
+        Every match is exact, so relevance_score is always 1.0.
+        """
+        try:
+            # Ensure collection is indexed
+            if self.collection.count() == 0:
+                self.index_trades()
+            
+            where_filter = self._resolve_filter(filter_dict)
+            if where_filter is _NO_MATCH:
+                return []
             
-            if results['ids'] and len(results['ids'][0]) > 0:
-                for i in range(len(results['ids'][0])):
-                    result = {
-                        "ticket_id": results['metadatas'][0][i]['ticket_id'],
-                        "client_name": results['metadatas'][0][i]['client_name'],
-                        "ticker": results['metadatas'][0][i]['ticker'],
-                        "side": results['metadatas'][0][i]['side'],
-                        "quantity": results['metadatas'][0][i]['quantity'],
-                        "price": results['metadatas'][0][i]['price'],
-                        "order_type": results['metadatas'][0][i]['order_type'],
-                        "solicited": results['metadatas'][0][i]['solicited'],
-                        "timestamp": results['metadatas'][0][i]['timestamp'],
-                        "description": results['documents'][0][i],
-                        "relevance_score": 1.0 - results['distances'][0][i]  # Convert distance to score
-                    }
-                    formatted_results.append(result)
+            results = self.collection.get(
+                where=where_filter,
+                limit=limit,
+                include=['metadatas', 'documents']
+            )
             
-            return formatted_results
+            return [_trade_result(meta, doc, 1.0) for meta, doc in zip(results['metadatas'], results['documents'])]
         
         except Exception as e:
             print(f"Error querying: {e}")
@@ -252,27 +568,15 @@ class TradeRAG:
     
     def get_client_trades(self, client_name: str, limit: int = 10) -> List[Dict]:
         """Get all trades for a specific client"""
-        return self.query(
-            query_text=f"trades by {client_name}",
-            limit=limit,
-            filter_dict={"client_name": client_name}
-        )
+        return self._metadata_lookup({"client_name": client_name}, limit)
     
     def get_ticker_trades(self, ticker: str, limit: int = 10) -> List[Dict]:
         """Get all trades for a specific ticker"""
-        return self.query(
-            query_text=f"trades of {ticker}",
-            limit=limit,
-            filter_dict={"ticker": ticker.upper()}
-        )
+        return self._metadata_lookup({"ticker": ticker.upper()}, limit)
     
     def get_recent_solicited_trades(self, limit: int = 10) -> List[Dict]:
         """Get recent solicited trades"""
-        return self.query(
-            query_text="solicited trades",
-            limit=limit,
-            filter_dict={"solicited": True}
-        )
+        return self._metadata_lookup({"solicited": True}, limit)
     
     def search_by_notes(self, keyword: str, limit: int = 10) -> List[Dict]:
         """Search trades by keywords in notes"""
@@ -282,6 +586,22 @@ class TradeRAG:
         )
 
 
+# Shared instances; Chroma's PersistentClient must not be built concurrently
+_RAG_LOCK = threading.Lock()
+_KB_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _build_rag() -> TradeRAG:
+    return TradeRAG()
+
+
+def _get_rag() -> TradeRAG:
+    """Process-wide TradeRAG, so the client and embedder are set up once"""
+    with _RAG_LOCK:
+        return _build_rag()
+
+
 # Tool functions for agent
 def query_trade_history(query: str, limit: int = 5) -> str:
     """
@@ -294,21 +614,20 @@ def query_trade_history(query: str, limit: int = 5) -> str:
     - "Trades with compliance issues"
     """
     try:
-        rag = TradeRAG()
+        rag = _get_rag()
         results = rag.query(query, limit=limit)
         
         if not results:
             return f"No trades found matching: '{query}'"
         
         # Format results
-        response = f"Found {len(results)} matching trade(s):\n\n"
-        
-        for i, trade in enumerate(results, 1):
-            response += f"{i}. {trade['description']}\n"
-            response += f"   Relevance: {trade['relevance_score']:.2%}\n"
-            response += f"   Ticket ID: {trade['ticket_id']}\n\n"
-        
-        return response
+        lines = [
+            f"{i}. {trade['description']}\n"
+            f"   Relevance: {trade['relevance_score']:.2%}\n"
+            f"   Ticket ID: {trade['ticket_id']}\n\n"
+            for i, trade in enumerate(results, 1)
+        ]
+        return f"Found {len(results)} matching trade(s):\n\n" + "".join(lines)
     
     except Exception as e:
         return f"❌ Error: {str(e)}"
@@ -317,19 +636,18 @@ def query_trade_history(query: str, limit: int = 5) -> str:
 def get_client_history(client_name: str, limit: int = 10) -> str:
     """Get trade history for a specific client"""
     try:
-        rag = TradeRAG()
+        rag = _get_rag()
         results = rag.get_client_trades(client_name, limit=limit)
         
         if not results:
             return f"No trades found for client: {client_name}"
         
-        response = f"📊 Trade history for {client_name} ({len(results)} trades):\n\n"
-        
-        for i, trade in enumerate(results, 1):
-            response += f"{i}. {trade['side']} {trade['quantity']} {trade['ticker']} "
-            response += f"@ ${trade['price']:.2f} ({trade['timestamp']})\n"
-        
-        return response
+        lines = [
+            f"{i}. {trade['side']} {trade['quantity']} {trade['ticker']} "
+            f"@ ${_FMT(trade['price'])} ({trade['timestamp']})\n"
+            for i, trade in enumerate(results, 1)
+        ]
+        return f"📊 Trade history for {client_name} ({len(results)} trades):\n\n" + "".join(lines)
     
     except Exception as e:
         return f"❌ Error: {str(e)}"
@@ -338,145 +656,159 @@ def get_client_history(client_name: str, limit: int = 10) -> str:
 def get_ticker_history(ticker: str, limit: int = 10) -> str:
     """Get trade history for a specific stock ticker"""
     try:
-        rag = TradeRAG()
+        rag = _get_rag()
         results = rag.get_ticker_trades(ticker, limit=limit)
         
         if not results:
             return f"No trades found for ticker: {ticker}"
         
-        response = f"📈 Trade history for {ticker} ({len(results)} trades):\n\n"
-        
-        for i, trade in enumerate(results, 1):
-            response += f"{i}. {trade['client_name']}: {trade['side']} {trade['quantity']} "
-            response += f"@ ${trade['price']:.2f} ({trade['timestamp']})\n"
-        
-        return response
+        lines = [
+            f"{i}. {trade['client_name']}: {trade['side']} {trade['quantity']} "
+            f"@ ${_FMT(trade['price'])} ({trade['timestamp']})\n"
+            for i, trade in enumerate(results, 1)
+        ]
+        return f"📈 Trade history for {ticker} ({len(results)} trades):\n\n" + "".join(lines)
     
     except Exception as e:
         return f"❌ Error: {str(e)}"
 
 
 def index_all_trades(force_reindex: bool = False) -> str:
-    """Index all trades into vector database"""
+    """Index all trades into vector database (on the background worker; long runs keep going past the wait)"""
     try:
-        rag = TradeRAG()
-        result = rag.index_trades(force_reindex=force_reindex)
+        rag = _get_rag()
+        future = rag.index_trades_async(force_reindex=force_reindex)
+        try:
+            result = future.result(timeout=INDEX_RESULT_TIMEOUT)
+        except FutureTimeoutError:
+            return "⏳ Trade indexing is still running in the background; its outcome will be logged when it finishes"
         
-        if result['success']:
+        if result["success"]:
             return f"✅ {result['message']}"
-        else:
-            return f"❌ {result['message']}"
+        return f"❌ {result['message']}"
     
     except Exception as e:
         return f"❌ Error: {str(e)}"
 
 
+_KB_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=KB_CHUNK_SIZE,
+    chunk_overlap=KB_CHUNK_OVERLAP,
+    separators=["\n\n", "\n", ". ", " "]
+) if HAS_TEXT_SPLITTER else None
+
+
+def _pack_paragraphs(content: str, size: int = KB_CHUNK_SIZE) -> List[str]:
+    """
+    Stdlib fallback splitter: greedily pack blank-line paragraphs into chunks of at most size characters
+    
+    A paragraph longer than size is cut at the last whitespace before the limit,
+    or at the limit itself when there is none.
+    """
+    pieces = []
+    for paragraph in re.split(r'\n\n+', content):
+        paragraph = paragraph.strip()
+        while len(paragraph) > size:
+            cut = max(paragraph.rfind(' ', 0, size + 1), paragraph.rfind('\n', 0, size + 1))
+            cut = cut if cut > 0 else size
+            pieces.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if paragraph:
+            pieces.append(paragraph)
+    
+    chunks = []
+    for piece in pieces:
+        if chunks and len(chunks[-1]) + 2 + len(piece) <= size:
+            chunks[-1] += "\n\n" + piece
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+def _read_kb_sections(filename: str, prefix: str) -> List[Dict]:
+    """Split one knowledge base file into chunks of at most KB_CHUNK_SIZE characters"""
+    path = KB_DOCS_DIR / filename
+    if not path.exists():
+        return []
+    
+    content = path.read_text(encoding='utf-8')
+    if HAS_TEXT_SPLITTER:
+        sections = _KB_SPLITTER.split_text(content)
+    else:
+        sections = _pack_paragraphs(content)
+    return [
+        {'id': f'{prefix}_{i}', 'text': section.strip(), 'source': filename}
+        for i, section in enumerate(sections)
+        if section.strip()
+    ]
+
+
+@functools.lru_cache(maxsize=1)
+def _build_kb():
+    """Open the knowledge base collection, indexing the docs on first use"""
+    # Initialize ChromaDB for knowledge base
+    kb_client = chromadb.PersistentClient(
+        path=str(DATA_DIR / "compliance_memory"),
+        settings=Settings(
+            anonymized_telemetry=False,
+            allow_reset=True
+        )
+    )
+    
+    # Get or create knowledge base collection
+    kb_collection = _open_collection(kb_client, KB_COLLECTION, "Compliance guidelines and trading rules")
+    
+    # Check if we need to index the knowledge base
+    if kb_collection.count() == 0:
+        # Read and index knowledge base documents, all files concurrently
+        with ThreadPoolExecutor(max_workers=len(KB_DOCUMENTS)) as executor:
+            docs_to_index = [
+                doc
+                for docs in executor.map(lambda entry: _read_kb_sections(*entry), KB_DOCUMENTS)
+                for doc in docs
+            ]
+        
+        # Index documents
+        if docs_to_index:
+            kb_collection.add(
+                ids=[doc['id'] for doc in docs_to_index],
+                documents=[doc['text'] for doc in docs_to_index],
+                metadatas=[{'source': doc['source']} for doc in docs_to_index]
+            )
+    
+    return kb_client, kb_collection
+
+
+def _get_kb():
+    """Process-wide (kb_client, kb_collection) pair"""
+    with _KB_LOCK:
+        return _build_kb()
+
+
 def query_knowledge_base(query: str) -> str:
     """
     Query compliance guidelines, risk rules, and trading procedures
     from knowledge base documents
     """
     try:
-        # Initialize ChromaDB for knowledge base
-        kb_client = chromadb.PersistentClient(
-            path=str(DATA_DIR / "compliance_memory"),
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
-        )
-        
-        embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
-        )
-        
-        # Get or create knowledge base collection
-        kb_collection = kb_client.get_or_create_collection(
-            name="compliance_knowledge",
-            embedding_function=embedding_fn,
-            metadata={"description": "Compliance guidelines and trading rules"}
-        )
-        
-        # Check if we need to index the knowledge base
-        if kb_collection.count() == 0:
-            # Read and index knowledge base documents
-            docs_to_index = []
-            
-            # Read compliance guidelines
-            compliance_file = DATA_DIR.parent / "docs" / "compliance_guidelines.txt"
-            if compliance_file.exists():
-                with open(compliance_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # Split into sections
-                    sections = content.split('\n\n')
-                    for i, section in enumerate(sections):
-                        if section.strip():
-                            docs_to_index.append({
-                                'id': f'compliance_{i}',
-                                'text': section.strip(),
-                                'source': 'compliance_guidelines.txt'
-                            })
-            
-            # Read risk assessment rules
-            risk_file = DATA_DIR.parent / "docs" / "risk_assessment_rules.txt"
-            if risk_file.exists():
-                with open(risk_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    sections = content.split('\n\n')
-                    for i, section in enumerate(sections):
-                        if section.strip():
-                            docs_to_index.append({
-                                'id': f'risk_{i}',
-                                'text': section.strip(),
-                                'source': 'risk_assessment_rules.txt'
-                            })
-            
-            # Read trading procedures
-            procedures_file = DATA_DIR.parent / "docs" / "trading_procedures.txt"
-            if procedures_file.exists():
-                with open(procedures_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    sections = content.split('\n\n')
-                    for i, section in enumerate(sections):
-                        if section.strip():
-                            docs_to_index.append({
-                                'id': f'procedure_{i}',
-                                'text': section.strip(),
-                                'source': 'trading_procedures.txt'
-                            })
-            
-            # Index documents
-            if docs_to_index:
-                kb_collection.add(
-                    ids=[doc['id'] for doc in docs_to_index],
-                    documents=[doc['text'] for doc in docs_to_index],
-                    metadatas=[{'source': doc['source']} for doc in docs_to_index]
-                )
+        kb_client, kb_collection = _get_kb()
         
         # Query the knowledge base
         results = kb_collection.query(
-            query_texts=[query],
-            n_results=3
+            query_embeddings=[list(_embed_query(query))],
+            n_results=3,
+            include=['documents', 'metadatas']
         )
         
         if not results['documents'] or not results['documents'][0]:
             return "I don't have specific information about that in my knowledge base."
         
-        # Format response with relevant excerpts
-        response = "💡 **I found this in my knowledge base:**\n\n"
-        
-        for i, (doc, metadata) in enumerate(zip(results['documents'][0], results['metadatas'][0])):
-            # Trim long documents
-            if len(doc) > 500:
-                doc = doc[:497] + "..."
-            
-            response += f"{doc}\n\n"
-            response += f"_Source: {metadata['source']}_\n\n"
-            
-            if i < len(results['documents'][0]) - 1:
-                response += "---\n\n"
-        
-        return response
+        # Format response with relevant excerpts (long documents trimmed)
+        excerpts = [
+            f"{doc if len(doc) <= 500 else doc[:497] + '...'}\n\n_Source: {metadata['source']}_\n\n"
+            for doc, metadata in zip(results['documents'][0], results['metadatas'][0])
+        ]
+        return "💡 **I found this in my knowledge base:**\n\n" + "---\n\n".join(excerpts)
     
     except Exception as e:
         return f"❌ Error querying knowledge base: {str(e)}"
@@ -1,41 +1,252 @@
 """
 Trade Data Management Tools
-Excel and CSV export with visualization capabilities
+Parquet trade store with Excel/CSV export and visualization capabilities
 """
+import csv
+import functools
+import html
+import itertools
+import openpyxl
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import os
+import shutil
+import threading
+from concurrent.futures import Future
 from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
+from urllib.parse import unquote
 
 # Optional: matplotlib for visualization
 try:
-    import matplotlib.pyplot as plt
-    import matplotlib
-    matplotlib.use('Agg')  # Non-interactive backend
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg  # Non-interactive backend
     import io
     import base64
+    from PIL import Image  # Pillow is a matplotlib dependency
     HAS_MATPLOTLIB = True
 except ImportError:
     HAS_MATPLOTLIB = False
 
 # Data directory
 DATA_DIR = Path(__file__).parent.parent / "data"
+TRADES_PARQUET = DATA_DIR / "trade_blotter"  # Parquet dataset directory, partitioned by Stage
 EXCEL_FILE = DATA_DIR / "trade_blotter.xlsx"
 CSV_FILE = DATA_DIR / "trade_blotter.csv"
 
+_SCHEMA = pa.schema([
+    pa.field('Ticket_ID', pa.string()),
+    pa.field('Timestamp', pa.string()),
+    pa.field('Client_Name', pa.string()),
+    pa.field('Account_Number', pa.string()),
+    pa.field('Ticker', pa.string()),
+    pa.field('Side', pa.string()),
+    pa.field('Quantity', pa.int64()),
+    pa.field('Order_Type', pa.string()),
+    pa.field('Price', pa.float64()),
+    pa.field('Solicited', pa.bool_()),
+    pa.field('Notes', pa.string()),
+    pa.field('Email', pa.string()),
+    pa.field('Stage', pa.string()),
+    pa.field('Follow_Up_Date', pa.string()),
+    pa.field('Meeting_Needed', pa.bool_()),
+])
+_FIELDS = tuple(_SCHEMA.names)
+# (column, trade_data key) pairs and the defaults used by save_trade
+_FIELD_KEYS = tuple((field, field.lower()) for field in _FIELDS)
+_DEFAULTS = {
+    'Side': 'Buy',
+    'Quantity': 0,
+    'Order_Type': 'Market',
+    'Price': 0.0,
+    'Solicited': False,
+    'Stage': 'Pending',
+    'Meeting_Needed': False,
+}
+
+# Column names used by older blotters (e.g. the ADK save_trade_to_csv tool), mapped onto _SCHEMA
+_LEGACY_COLUMNS = {
+    'Ticket ID': 'Ticket_ID',
+    'Client': 'Client_Name',
+    'Account': 'Account_Number',
+    'Qty': 'Quantity',
+    'Type': 'Order_Type',
+    'Follow-up': 'Follow_Up_Date',
+    'Meeting': 'Meeting_Needed',
+}
+# Name of the fragment holding trades migrated from a legacy blotter; sorts before every save
+_LEGACY_FRAGMENT = "00000000000000000000-{i}.parquet"
+
+# Pin text columns when reading a CSV blotter so IDs and account numbers keep leading zeros;
+# Solicited is left to inference since older blotters store it as text
+_TEXT_FIELDS = {f.name for f in _SCHEMA if f.type == pa.string()}
+_CSV_CONVERT = pacsv.ConvertOptions(
+    column_types={
+        name: pa.string()
+        for name in (*_TEXT_FIELDS, *(old for old, new in _LEGACY_COLUMNS.items() if new in _TEXT_FIELDS))
+    }
+)
+_CSV_PARSE = pacsv.ParseOptions(newlines_in_values=True)
+
+# Reusable chart figures by layout; pyplot is avoided and the figures are not thread-safe
+_FIGURES: Dict[str, "Figure"] = {}
+_FIGURE_LOCK = threading.Lock()
+
+# Rendered charts (PNG bytes) keyed on (chart_type, store stamp)
+_CHART_CACHE: Dict[tuple, bytes] = {}
+
+# Text spellings of a solicited / true flag in older blotters and trade_data
+_TRUE_STRINGS = ('solicited', 'yes', 'true', '1')
+
+# Low-cardinality columns held as pandas categoricals once loaded
+_CATEGORY_COLUMNS = ('Ticker', 'Side', 'Stage', 'Order_Type')
+
+
+def _as_bool(value) -> bool:
+    """Coerce a trade flag given as bool, number or text to a bool"""
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUE_STRINGS
+    return bool(value)
+
+
+def _legacy_table(df: pd.DataFrame) -> pa.Table:
+    """Normalize a legacy CSV/xlsx blotter onto _SCHEMA so it can seed the Parquet store"""
+    df = df.rename(columns=_LEGACY_COLUMNS)
+    columns = {}
+    for field in _SCHEMA:
+        default = _DEFAULTS.get(field.name, '')
+        col = df[field.name] if field.name in df.columns else pd.Series(default, index=df.index)
+        if field.type == pa.bool_():
+            columns[field.name] = col.astype(str).str.lower().isin(_TRUE_STRINGS) | (col == True)
+        elif field.type == pa.int64():
+            columns[field.name] = pd.to_numeric(col, errors='coerce').fillna(default).astype('int64')
+        elif field.type == pa.float64():
+            columns[field.name] = pd.to_numeric(col, errors='coerce').fillna(default).astype('float64')
+        else:
+            text = col.astype(object).where(col.notna(), '').astype(str)
+            columns[field.name] = text.replace('', default) if default else text
+    return pa.Table.from_pandas(pd.DataFrame(columns), schema=_SCHEMA, preserve_index=False)
+
+
+def _fragments(parquet_dir: Path) -> List[Path]:
+    """Parquet fragments of the store, oldest write first
+    
+    Fragment names start with their write time (the legacy seed sorts first), and
+    one write uses the same name in every Stage partition it touches.
+    """
+    return sorted(parquet_dir.glob('*/*.parquet'), key=lambda f: (f.name, f.parent.name))
+
+
+def _read_fragments(paths: List[Path]) -> pd.DataFrame:
+    """Read Parquet fragments (as ordered by _fragments) into one frame in write order
+    
+    Rows of one write that landed in different Stage partitions are put back in
+    time order. Timestamp is parsed for that, since legacy rows use a 12-hour
+    format that does not sort as text.
+    """
+    tables = []
+    for write, (_, group) in enumerate(itertools.groupby(paths, key=lambda f: f.name)):
+        for path in group:
+            table = _read_fragment(path)
+            tables.append(table.append_column('_write', pa.array([write] * table.num_rows, pa.int64())))
+    if not tables:
+        return pd.DataFrame(columns=list(_SCHEMA.names))
+    df = pa.concat_tables(tables).to_pandas()
+    df['_time'] = pd.to_datetime(df['Timestamp'], errors='coerce', format='mixed')
+    df = df.sort_values(['_write', '_time'], kind='stable', ignore_index=True)
+    return df[list(_SCHEMA.names)]
+
+
+def _read_fragment(path: Path) -> pa.Table:
+    """One fragment with its Stage restored from the partition directory"""
+    table = pq.read_table(path)
+    stage = unquote(path.parent.name.partition('=')[2])
+    return table.append_column('Stage', pa.array([stage] * table.num_rows, pa.string())).select(_SCHEMA.names)
+
+
+def _category_counts(series: pd.Series) -> Dict[str, int]:
+    """Occurrences of each value of a categorical column, counted on its integer codes"""
+    codes = series.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+    return {category: int(n) for category, n in zip(series.cat.categories, counts) if n}
+
+
+def _chart_figure(layout: str) -> "Figure":
+    """Return the shared figure for a chart layout ('all' or 'single') with its axes cleared"""
+    fig = _FIGURES.get(layout)
+    if fig is None:
+        if layout == "all":
+            fig = Figure(figsize=(15, 10), dpi=100, layout='constrained')
+            fig.subplots(2, 2)
+            fig.suptitle('Trade Analytics Dashboard', fontsize=16, fontweight='bold')
+        else:
+            fig = Figure(figsize=(10, 6), dpi=100, layout='constrained')
+            fig.subplots()
+        FigureCanvasAgg(fig)
+        _FIGURES[layout] = fig
+    for ax in fig.axes:
+        ax.clear()
+        # clear() keeps the equal aspect, fixed limits, hidden frame and axis that
+        # pie()/axis('off') leave behind, so restore the defaults for the next chart
+        ax.set_aspect('auto')
+        ax.set_autoscale_on(True)
+        ax.set_frame_on(True)
+        ax.set_axis_on()
+    return fig
+
+
+# Trades waiting to be written, as (manager, row, table, Future). Saves commit as a
+# group on the caller's thread: whichever save holds _WRITE_LOCK writes every trade
+# pending at that moment, so trades that arrive during a write share the next one.
+_PENDING_WRITES: List[tuple] = []
+_PENDING_LOCK = threading.Lock()
+_WRITE_LOCK = threading.Lock()
+
+
+def _write_pending():
+    """Persist every pending trade, one append per manager; call with _WRITE_LOCK held"""
+    with _PENDING_LOCK:
+        batch = _PENDING_WRITES[:]
+        _PENDING_WRITES.clear()
+    
+    # Group by manager so each store gets one append per batch
+    pending: Dict[int, tuple] = {}
+    for manager, row, table, done in batch:
+        group = pending.setdefault(id(manager), (manager, [], [], []))
+        group[1].append(row)
+        group[2].append(table)
+        group[3].append(done)
+    for manager, rows, tables, waiters in pending.values():
+        try:
+            manager._write_rows(rows, tables)
+        except Exception as e:
+            for done in waiters:
+                done.set_exception(e)
+        else:
+            for done in waiters:
+                done.set_result(None)
+
 
 class TradeDataManager:
-    """Manage trade data in Excel and CSV formats"""
+    """Manage trade data in a Parquet dataset with Excel and CSV exports"""
+    
+    # Last blotter load shared across managers: (source stamp, DataFrame)
+    _cache = (None, None)
+    _haystack_cache = (None, None)
     
     def __init__(self):
+        self.parquet_dir = TRADES_PARQUET
         self.excel_file = EXCEL_FILE
         self.csv_file = CSV_FILE
         DATA_DIR.mkdir(exist_ok=True)
     
     def save_trade(self, trade_data: Dict) -> str:
         """
-        Save a trade to Excel and CSV
+        Append a trade to the Parquet store and the CSV
         
         Args:
             trade_data: Dictionary with trade information
@@ -44,48 +255,189 @@ class TradeDataManager:
             Success message with ticket ID
         """
         try:
-            # Create DataFrame for new trade
-            new_trade = pd.DataFrame([{
-                'Ticket_ID': trade_data.get('ticket_id', self._generate_ticket_id()),
-                'Timestamp': datetime.now().isoformat(),
-                'Client_Name': trade_data.get('client_name', ''),
-                'Account_Number': trade_data.get('account_number', ''),
-                'Ticker': trade_data.get('ticker', '').upper(),
-                'Side': trade_data.get('side', 'Buy'),
-                'Quantity': trade_data.get('quantity', 0),
-                'Order_Type': trade_data.get('order_type', 'Market'),
-                'Price': trade_data.get('price', 0.0),
-                'Solicited': trade_data.get('solicited', False),
-                'Notes': trade_data.get('notes', ''),
-                'Email': trade_data.get('email', ''),
-                'Stage': trade_data.get('stage', 'Pending'),
-                'Follow_Up_Date': trade_data.get('follow_up_date', ''),
-                'Meeting_Needed': trade_data.get('meeting_needed', False)
-            }])
+            row = {field: trade_data.get(key, _DEFAULTS.get(field, '')) for field, key in _FIELD_KEYS}
+            row['Ticket_ID'] = row['Ticket_ID'] or self._generate_ticket_id()
+            row['Timestamp'] = datetime.now().isoformat()
+            row['Ticker'] = row['Ticker'].upper()
+            row['Solicited'] = _as_bool(row['Solicited'])
+            row['Meeting_Needed'] = _as_bool(row['Meeting_Needed'])
             
-            # Load existing data or create new
-            if self.excel_file.exists():
-                existing_df = pd.read_excel(self.excel_file)
-                df = pd.concat([existing_df, new_trade], ignore_index=True)
-            else:
-                df = new_trade
-            
-            # Save to Excel
-            df.to_excel(self.excel_file, index=False)
+            # Converting here surfaces schema errors before anything is queued
+            table = pa.Table.from_pylist([row], schema=_SCHEMA)
             
-            # Save to CSV
-            df.to_csv(self.csv_file, index=False)
-            
-            return f"Trade saved successfully. Ticket ID: {new_trade['Ticket_ID'].iloc[0]}"
+            # Written synchronously, batched with any concurrent saves; success is only
+            # reported once the trade is on disk, and a write error is re-raised here
+            done = Future()
+            with _PENDING_LOCK:
+                _PENDING_WRITES.append((self, row, table, done))
+            with _WRITE_LOCK:
+                if not done.done():
+                    _write_pending()
+            done.result()
+            return f"Trade saved successfully. Ticket ID: {row['Ticket_ID']}"
         
         except Exception as e:
             return f"Error saving trade: {str(e)}"
     
+    def _write_rows(self, rows: List[Dict], tables: List[pa.Table]):
+        """Append a batch of trades to the Parquet store and the CSV"""
+        if not self.parquet_dir.exists():
+            self._seed_from_legacy()
+        
+        # Each batch lands as new fragments; existing trades are never re-read or rewritten
+        pq.write_to_dataset(
+            pa.concat_tables(tables),
+            root_path=self.parquet_dir,
+            partition_cols=['Stage'],
+            compression='zstd',
+            basename_template=f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{{i}}.parquet"
+        )
+        
+        # Mirror the rows onto the CSV as appended lines
+        is_new = not self.csv_file.exists()
+        with self.csv_file.open('a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=_FIELDS)
+            if is_new:
+                writer.writeheader()
+            writer.writerows(rows)
+        
+        TradeDataManager._cache = (None, None)
+        _CHART_CACHE.clear()
+    
+    def _seed_from_legacy(self):
+        """Copy an existing CSV/xlsx blotter into a new Parquet store
+        
+        Runs before the store's first write, so trades recorded before the switch
+        to Parquet stay visible. The CSV is rewritten with the full history in
+        _FIELDS columns, after which it mirrors the store line for line.
+        """
+        stamp = self._legacy_stamp()
+        if stamp is None:
+            return
+        table = _legacy_table(self._read_legacy(stamp[0]))
+        if table.num_rows == 0:
+            return
+        
+        pq.write_to_dataset(
+            table,
+            root_path=self.parquet_dir,
+            partition_cols=['Stage'],
+            compression='zstd',
+            basename_template=_LEGACY_FRAGMENT
+        )
+        # Check the footers before the CSV is rewritten; a short seed is removed so the next save retries it
+        stored = self.trade_count()
+        if stored != table.num_rows:
+            shutil.rmtree(self.parquet_dir, ignore_errors=True)
+            raise RuntimeError(
+                f"Legacy migration wrote {stored} of {table.num_rows} trades; the Parquet store was not created"
+            )
+        
+        with self.csv_file.open('w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=_FIELDS)
+            writer.writeheader()
+            writer.writerows(table.to_pylist())
+        source = self.csv_file if stamp[0] == 'csv' else self.excel_file
+        print(f"✅ Migrated {table.num_rows} trades from {source.name} into the Parquet trade store")
+    
+    def _source_stamp(self) -> Optional[tuple]:
+        """Modification stamp of whichever store get_all_trades reads"""
+        if self.parquet_dir.exists():
+            # A new fragment only bumps the mtime of its Stage directory
+            dirs = (self.parquet_dir, *self.parquet_dir.iterdir())
+            return ('parquet', max(d.stat().st_mtime_ns for d in dirs))
+        return self._legacy_stamp()
+    
+    def _legacy_stamp(self) -> Optional[tuple]:
+        """Stamp of the CSV/xlsx blotter used before a Parquet store exists
+        
+        The CSV is preferred whenever it is at least as new as the workbook,
+        since it parses much faster.
+        """
+        excel_mtime = self.excel_file.stat().st_mtime_ns if self.excel_file.exists() else None
+        csv_mtime = self.csv_file.stat().st_mtime_ns if self.csv_file.exists() else None
+        if csv_mtime is not None and (excel_mtime is None or csv_mtime >= excel_mtime):
+            return ('csv', csv_mtime)
+        if excel_mtime is not None:
+            return ('excel', excel_mtime)
+        return None
+    
     def get_all_trades(self) -> pd.DataFrame:
-        """Load all trades from Excel"""
-        if self.excel_file.exists():
-            return pd.read_excel(self.excel_file)
-        return pd.DataFrame()
+        """Load all trades from the Parquet store, falling back to a legacy CSV/Excel blotter
+        
+        The result is shared between callers until the store changes; treat it as read-only.
+        """
+        stamp = self._source_stamp()
+        if stamp is None:
+            return pd.DataFrame()
+        cached_stamp, cached_df = TradeDataManager._cache
+        if stamp == cached_stamp:
+            return cached_df
+        
+        if stamp[0] == 'parquet':
+            df = _read_fragments(_fragments(self.parquet_dir))
+        else:
+            df = self._read_legacy(stamp[0])
+        for col in _CATEGORY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        # Older CSV/xlsx blotters store Solicited as text; normalize once here so readers can sum it
+        if 'Solicited' in df.columns and not pd.api.types.is_bool_dtype(df['Solicited']):
+            solicited = df['Solicited']
+            df['Solicited'] = solicited.astype(str).str.lower().isin(_TRUE_STRINGS) | (solicited == True)
+        TradeDataManager._cache = (stamp, df)
+        return df
+    
+    def _read_legacy(self, kind: str) -> pd.DataFrame:
+        """Read the legacy blotter named by _legacy_stamp ('csv' or 'excel')"""
+        if kind == 'csv':
+            return pacsv.read_csv(
+                self.csv_file, parse_options=_CSV_PARSE, convert_options=_CSV_CONVERT
+            ).to_pandas()
+        return pd.read_excel(self.excel_file)
+    
+    def trade_count(self) -> int:
+        """Number of stored trades, taken from Parquet footers without decoding any data"""
+        if self.parquet_dir.exists():
+            return sum(pq.read_metadata(f).num_rows for f in self.parquet_dir.glob('*/*.parquet'))
+        return len(self.get_all_trades())
+    
+    def export_excel(self) -> str:
+        """Write the current blotter to the .xlsx file (on demand only)"""
+        try:
+            df = self.get_all_trades()
+            if df.empty:
+                return "No trades to export"
+            self._write_excel_streaming(df)
+            return f"Exported {len(df)} trades to {self.excel_file.name}"
+        except Exception as e:
+            return f"Error exporting trades: {str(e)}"
+    
+    def refresh_excel_export(self) -> Optional[str]:
+        """
+        Re-export the .xlsx when the Parquet store has changed since it was last written
+        
+        Returns:
+            The export message, or None when the workbook is already current or there is
+            no Parquet store yet (the legacy xlsx is then still the blotter itself)
+        """
+        stamp = self._source_stamp()
+        if stamp is None or stamp[0] != 'parquet':
+            return None
+        if self.excel_file.exists() and self.excel_file.stat().st_mtime_ns >= stamp[1]:
+            return None
+        return self.export_excel()
+    
+    def _write_excel_streaming(self, df: pd.DataFrame):
+        """Stream rows into a write-only workbook so memory stays flat"""
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Trades")
+        ws.append(df.columns.tolist())
+        # Blank cells instead of NaN, which is not a valid xlsx number
+        df = df.astype(object).where(df.notna(), None)
+        for row in df.itertuples(index=False, name=None):
+            ws.append(row)
+        wb.save(self.excel_file)
     
     def get_trade_summary(self) -> Dict:
         """Get summary statistics of trades"""
@@ -98,22 +450,22 @@ class TradeDataManager:
         qty_col = 'Qty' if 'Qty' in df.columns else 'Quantity'
         client_col = 'Client' if 'Client' in df.columns else 'Client_Name'
         
-        # Convert Solicited column to boolean if it's string
-        if 'Solicited' in df.columns and df['Solicited'].dtype == object:
-            df['Solicited_Bool'] = df['Solicited'].str.lower() == 'solicited'
-        else:
-            df['Solicited_Bool'] = df['Solicited'] == True
+        # Side and Ticker are categoricals (see get_all_trades), so count their codes directly
+        side_counts = _category_counts(df['Side'])
+        ticker_counts = _category_counts(df['Ticker'])
+        total = len(df)
+        n_solicited = int(df['Solicited'].to_numpy().sum())
         
         return {
-            "total_trades": len(df),
-            "buy_orders": len(df[df['Side'] == 'Buy']),
-            "sell_orders": len(df[df['Side'] == 'Sell']),
-            "solicited": int(df['Solicited_Bool'].sum()),
-            "unsolicited": int((~df['Solicited_Bool']).sum()),
+            "total_trades": total,
+            "buy_orders": side_counts.get('Buy', 0),
+            "sell_orders": side_counts.get('Sell', 0),
+            "solicited": n_solicited,
+            "unsolicited": total - n_solicited,
             "total_volume": int(df[qty_col].sum()),
-            "unique_tickers": df['Ticker'].nunique(),
+            "unique_tickers": len(ticker_counts),
             "unique_clients": df[client_col].nunique(),
-            "most_traded": df['Ticker'].value_counts().index[0] if len(df) > 0 else "N/A"
+            "most_traded": max(ticker_counts, key=ticker_counts.get) if ticker_counts else "N/A"
         }
     
     def generate_trade_chart(self, chart_type: str = "buy_sell") -> str:
@@ -126,17 +478,43 @@ class TradeDataManager:
         Returns:
             Base64 encoded PNG image
         """
+        try:
+            png = self.generate_trade_chart_png(chart_type)
+        except Exception as e:
+            return f"Error generating chart: {str(e)}"
+        
+        if png is None:
+            return "No data available for chart generation"
+        return base64.b64encode(png).decode()
+    
+    def generate_trade_chart_png(self, chart_type: str = "buy_sell") -> Optional[bytes]:
+        """
+        Render a trade analytics chart as raw PNG bytes
+        
+        Args:
+            chart_type: Type of chart ('buy_sell', 'solicited', 'top_tickers', 'all')
+        
+        Returns:
+            PNG image bytes, or None when there are no trades
+        """
+        stamp = self._source_stamp()
+        key = (chart_type, stamp)
+        if key in _CHART_CACHE:
+            return _CHART_CACHE[key]
+        
         df = self.get_all_trades()
         
         if df.empty:
-            return "No data available for chart generation"
+            return None
         
-        try:
+        summary = self.get_trade_summary() if chart_type == "all" else None
+        
+        with _FIGURE_LOCK:
+            fig = _chart_figure("all" if chart_type == "all" else "single")
             if chart_type == "all":
-                fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
-                fig.suptitle('Trade Analytics Dashboard', fontsize=16, fontweight='bold')
+                ax1, ax2, ax3, ax4 = fig.axes
             else:
-                fig, ax1 = plt.subplots(figsize=(10, 6))
+                ax1 = fig.axes[0]
             
             # Buy vs Sell Distribution
             if chart_type in ["buy_sell", "all"]:
@@ -178,7 +556,6 @@ class TradeDataManager:
             # Summary Statistics
             if chart_type == "all":
                 ax4.axis('off')
-                summary = self.get_trade_summary()
                 summary_text = f"""
 SUMMARY STATISTICS
 
@@ -193,39 +570,63 @@ Most Traded: {summary['most_traded']}
                 ax4.text(0.1, 0.5, summary_text, fontsize=12, verticalalignment='center',
                         bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
             
-            plt.tight_layout()
-            
-            # Convert to base64
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            plt.close()
-            
-            return image_base64
+            # Render once on the Agg canvas; copy the RGBA buffer out before the
+            # figure can be redrawn by another caller, then PNG-encode it directly
+            fig.canvas.draw()
+            image = Image.fromarray(np.array(fig.canvas.buffer_rgba()))
         
-        except Exception as e:
-            return f"Error generating chart: {str(e)}"
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', compress_level=1)
+        png = buffer.getvalue()
+        
+        # Charts rendered from an older version of the store can never be hit again
+        for old_key in [k for k in _CHART_CACHE if k[1] != stamp]:
+            del _CHART_CACHE[old_key]
+        _CHART_CACHE[key] = png
+        return png
     
     def get_trades_table_html(self, limit: int = 10) -> str:
         """Get HTML table of recent trades"""
-        df = self.get_all_trades()
+        stamp = self._source_stamp()
+        if stamp is not None and stamp[0] == 'parquet' and stamp != TradeDataManager._cache[0]:
+            # Blotter not loaded yet; read only the newest fragments instead of the whole store
+            recent_df = self._read_recent_trades(limit)
+        else:
+            recent_df = self.get_all_trades().tail(limit)
         
-        if df.empty:
+        if recent_df.empty:
             return "<p>No trades found</p>"
         
-        # Get last N trades
-        recent_df = df.tail(limit)
+        # Build the table markup directly; DataFrame.to_html is far heavier for a handful of rows
+        recent_df = recent_df.astype(object).where(recent_df.notna(), 'NaN')
+        header = ''.join(f'<th>{html.escape(str(col))}</th>' for col in recent_df.columns)
+        rows = ''.join(
+            '<tr>' + ''.join(f'<td>{html.escape(str(value))}</td>' for value in record) + '</tr>'
+            for record in recent_df.itertuples(index=False, name=None)
+        )
         
-        # Convert to HTML with styling
-        html = recent_df.to_html(
-            index=False,
-            classes='trade-table',
-            border=0,
-            justify='center'
+        return (
+            '<table border="0" class="dataframe trade-table">'
+            f'<thead><tr style="text-align: center;">{header}</tr></thead>'
+            f'<tbody>{rows}</tbody></table>'
         )
+    
+    def _read_recent_trades(self, limit: int) -> pd.DataFrame:
+        """Read the last `limit` trades from the Parquet store, newest writes first"""
+        # Whole writes are read, since one write can span several Stage partitions;
+        # row counts come from the footers, so skipped fragments are never decoded
+        recent = []
+        total = 0
+        for _, group in itertools.groupby(reversed(_fragments(self.parquet_dir)), key=lambda f: f.name):
+            group = list(group)
+            recent[:0] = reversed(group)
+            total += sum(pq.read_metadata(f).num_rows for f in group)
+            if total >= limit:
+                break
         
-        return html
+        if not recent:
+            return pd.DataFrame()
+        return _read_fragments(recent).tail(limit)
     
     def search_trades(self, query: str) -> pd.DataFrame:
         """Search trades by client name, ticker, or notes"""
@@ -234,31 +635,55 @@ Most Traded: {summary['most_traded']}
         if df.empty:
             return df
         
-        query_lower = query.lower()
-        mask = (
-            df['Client_Name'].str.lower().str.contains(query_lower, na=False) |
-            df['Ticker'].str.lower().str.contains(query_lower, na=False) |
-            df['Notes'].str.lower().str.contains(query_lower, na=False)
-        )
-        
+        mask = self._search_haystack(df).str.contains(query.lower(), regex=False, na=False)
         return df[mask]
     
+    def _search_haystack(self, df: pd.DataFrame) -> pd.Series:
+        """Lowercased client/ticker/notes text per trade, cached alongside the loaded blotter"""
+        cached_df, haystack = TradeDataManager._haystack_cache
+        if cached_df is df:
+            return haystack
+        
+        parts = [df[col].astype(object).fillna('').astype(str) for col in ('Client_Name', 'Ticker', 'Notes')]
+        # Unit separator keeps a query from matching across two fields
+        haystack = (parts[0] + '\x1f' + parts[1] + '\x1f' + parts[2]).str.lower()
+        TradeDataManager._haystack_cache = (df, haystack)
+        return haystack
+    
     def _generate_ticket_id(self) -> str:
         """Generate unique ticket ID"""
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         return f"TKT-{timestamp}"
 
 
+@functools.lru_cache(maxsize=1)
+def _mgr() -> TradeDataManager:
+    """Shared TradeDataManager for the tool functions"""
+    return TradeDataManager()
+
+
 # Tool functions for agent
 def save_trade_to_excel(trade_data: Dict) -> str:
-    """Save trade data to Excel and CSV"""
-    manager = TradeDataManager()
+    """Save trade data to the trade store and CSV"""
+    manager = _mgr()
     return manager.save_trade(trade_data)
 
 
+def export_trades_to_excel() -> str:
+    """Export the trade blotter to Excel"""
+    manager = _mgr()
+    return manager.export_excel()
+
+
+def refresh_trade_blotter_excel() -> Optional[str]:
+    """Bring trade_blotter.xlsx up to date with the trade store before it is served or attached"""
+    manager = _mgr()
+    return manager.refresh_excel_export()
+
+
 def get_trade_summary() -> str:
     """Get summary of all trades"""
-    manager = TradeDataManager()
+    manager = _mgr()
     summary = manager.get_trade_summary()
     
     if "message" in summary:
@@ -280,19 +705,25 @@ Trade Summary:
 
 def generate_trade_chart(chart_type: str = "all") -> str:
     """Generate trade analytics chart (returns base64 image)"""
-    manager = TradeDataManager()
+    manager = _mgr()
     return manager.generate_trade_chart(chart_type)
 
 
+def generate_trade_chart_png(chart_type: str = "all") -> Optional[bytes]:
+    """Generate trade analytics chart as raw PNG bytes (None when there are no trades)"""
+    manager = _mgr()
+    return manager.generate_trade_chart_png(chart_type)
+
+
 def show_recent_trades(limit: int = 10) -> str:
     """Show recent trades in table format"""
-    manager = TradeDataManager()
+    manager = _mgr()
     return manager.get_trades_table_html(limit)
 
 
 def search_trade_records(query: str) -> str:
     """Search for trades by client, ticker, or notes"""
-    manager = TradeDataManager()
+    manager = _mgr()
     results = manager.search_trades(query)
     
     if results.empty:
@@ -5,8 +5,10 @@ Replaces Groq with IBM Granite model
 from ibm_watsonx_ai.foundation_models import ModelInference
 from ibm_watsonx_ai.metanames import GenTextParamsMetaNames as GenParams
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+import functools
 import os
-from typing import List
+import threading
+from typing import List, Optional, Tuple
 from watsonx_config import (
     WATSONX_API_KEY,
     WATSONX_PROJECT_ID,
@@ -16,6 +18,55 @@ from watsonx_config import (
 )
 
 
+# Prompt role labels by message class
+_ROLE = {
+    SystemMessage: "System",
+    HumanMessage: "Human",
+    AIMessage: "Assistant",
+}
+
+
+def _role(msg) -> Optional[str]:
+    """Prompt role for a message, including subclasses such as AIMessageChunk"""
+    role = _ROLE.get(type(msg))
+    if role is None:
+        role = next((label for cls, label in _ROLE.items() if isinstance(msg, cls)), None)
+    return role
+
+
+# One ModelInference (and its HTTP session / IAM token) shared by every WatsonxLLM
+_MODEL: Optional[ModelInference] = None
+_MODEL_LOCK = threading.Lock()
+
+
+def _get_model() -> ModelInference:
+    """Create the shared watsonx.ai model client on first use"""
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                from ibm_watsonx_ai import Credentials
+                
+                credentials = Credentials(
+                    url=WATSONX_URL,
+                    api_key=WATSONX_API_KEY
+                )
+                
+                _MODEL = ModelInference(
+                    model_id=WATSONX_MODEL_ID,
+                    credentials=credentials,
+                    project_id=WATSONX_PROJECT_ID,
+                    params=WATSONX_PARAMETERS
+                )
+    return _MODEL
+
+
+@functools.lru_cache(maxsize=32)
+def _format_system_prefix(contents: Tuple[str, ...]) -> str:
+    """Formatted leading system messages; these repeat unchanged across calls"""
+    return "\n\n".join(f"System: {content}" for content in contents)
+
+
 class WatsonxLLM:
     """Wrapper for IBM watsonx.ai Granite model"""
     
@@ -26,20 +77,7 @@ class WatsonxLLM:
                 "Missing watsonx credentials. Set WATSONX_API_KEY and WATSONX_PROJECT_ID in .env"
             )
         
-        # Initialize credentials
-        from ibm_watsonx_ai import Credentials
-        
-        credentials = Credentials(
-            url=WATSONX_URL,
-            api_key=WATSONX_API_KEY
-        )
-        
-        self.model = ModelInference(
-            model_id=WATSONX_MODEL_ID,
-            credentials=credentials,
-            project_id=WATSONX_PROJECT_ID,
-            params=WATSONX_PARAMETERS
-        )
+        self.model = _get_model()
     
     def invoke(self, messages: List) -> AIMessage:
         """
@@ -70,15 +108,19 @@ class WatsonxLLM:
         Returns:
             Formatted prompt string
         """
+        # Leading system messages are the stable part of the prompt, so their formatting is cached
+        split = 0
+        while split < len(messages) and _role(messages[split]) == "System":
+            split += 1
+        
         prompt_parts = []
+        if split:
+            prompt_parts.append(_format_system_prefix(tuple(msg.content for msg in messages[:split])))
         
-        for msg in messages:
-            if isinstance(msg, SystemMessage):
-                prompt_parts.append(f"System: {msg.content}")
-            elif isinstance(msg, HumanMessage):
-                prompt_parts.append(f"Human: {msg.content}")
-            elif isinstance(msg, AIMessage):
-                prompt_parts.append(f"Assistant: {msg.content}")
+        for msg in messages[split:]:
+            role = _role(msg)
+            if role is not None:
+                prompt_parts.append(f"{role}: {msg.content}")
         
         # Add final prompt for assistant response
         prompt_parts.append("Assistant:")
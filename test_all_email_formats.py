@@ -49,12 +49,16 @@ tests = [
 passed = 0
 failed = 0
 
+# One keep-alive session for the whole run. Tests stay sequential: the pronoun
+# commands ("mail her ...") resolve against the previous turn's context.
+session = requests.Session()
+
 for i, test in enumerate(tests, 1):
     print(f"\n{i}. {test['name']}")
     print(f"   Command: '{test['command']}'")
     
     try:
-        response = requests.post(url, json={"message": test['command']}, timeout=10)
+        response = session.post(url, json={"message": test['command']}, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -101,6 +105,8 @@ for i, test in enumerate(tests, 1):
     
     time.sleep(1)
 
+session.close()
+
 print("\n" + "="*70)
 print(f"RESULTS: {passed} passed, {failed} failed out of {len(tests)} tests")
 print("="*70)
@@ -5,13 +5,17 @@ import time
 
 url = "http://localhost:8003/chat"
 
+# One keep-alive session for all requests; they must run in order since
+# test 2 refers back to the client from test 1
+session = requests.Session()
+
 print("\n" + "="*70)
 print("TEST: Email Query and Send Fix")
 print("="*70)
 
 # Test 1: Query for email (should go to Excel agent, not Gmail)
 print("\n1. Testing: 'whats the email of sheila carter?'")
-response = requests.post(url, json={"message": "whats the email of sheila carter?"})
+response = session.post(url, timeout=10, json={"message": "whats the email of sheila carter?"})
 print(f"   Status: {response.status_code}")
 if response.status_code == 200:
     data = response.json()
@@ -31,7 +35,7 @@ time.sleep(1)
 
 # Test 2: Send email using pronoun (should use context)
 print("\n2. Testing: 'mail her that does she need a follow up meeting'")
-response = requests.post(url, json={"message": "mail her that does she need a follow up meeting"})
+response = session.post(url, timeout=10, json={"message": "mail her that does she need a follow up meeting"})
 print(f"   Status: {response.status_code}")
 if response.status_code == 200:
     data = response.json()
@@ -53,7 +57,7 @@ time.sleep(1)
 
 # Test 3: Direct send with name mention
 print("\n3. Testing: 'send email to sheila about meeting'")
-response = requests.post(url, json={"message": "send email to sheila about meeting"})
+response = session.post(url, timeout=10, json={"message": "send email to sheila about meeting"})
 print(f"   Status: {response.status_code}")
 if response.status_code == 200:
     data = response.json()
@@ -69,6 +73,8 @@ if response.status_code == 200:
     elif '@company.com' in result or '@example.com' in result:
         print("   ❌ HALLUCINATED EMAIL!")
 
+session.close()
+
 print("\n" + "="*70)
 print("TEST COMPLETE")
 print("="*70)
@@ -0,0 +1,104 @@
+"""Tests for the Parquet-backed trade store in tools/trade_data_tools.py"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "orqon_core"))
+
+from tools import trade_data_tools  # noqa: E402
+from tools.trade_data_tools import TradeDataManager  # noqa: E402
+
+
+def _manager(tmp_path) -> TradeDataManager:
+    """A TradeDataManager whose files all live under tmp_path"""
+    manager = TradeDataManager()
+    manager.parquet_dir = tmp_path / "trade_blotter"
+    manager.excel_file = tmp_path / "trade_blotter.xlsx"
+    manager.csv_file = tmp_path / "trade_blotter.csv"
+    TradeDataManager._cache = (None, None)
+    trade_data_tools._CHART_CACHE.clear()
+    return manager
+
+
+def test_legacy_blotter_survives_first_save(tmp_path):
+    manager = _manager(tmp_path)
+    manager.csv_file.write_text(
+        "Ticket ID,Client,Account,Side,Ticker,Qty,Type,Price,Solicited,Timestamp,Notes,Follow-up,Email,Stage,Meeting\n"
+        "TKT-1,Sheila Carter,007,Buy,AAPL,10,Market,190.5,Yes,2025-01-02 09:30 AM,,,,Executed,No\n"
+        "TKT-2,Bob Lee,008,Sell,MSFT,5,Limit,410,No,2025-01-03 10:00 AM,,,,Pending,No\n"
+        "TKT-3,Ann Wu,009,Buy,TSLA,1,Market,250,Yes,2025-01-04 11:15 AM,,,,,Yes\n",
+        encoding="utf-8",
+    )
+    assert len(manager.get_all_trades()) == 3
+    
+    result = manager.save_trade({"ticket_id": "TKT-4", "client_name": "Dan", "ticker": "nvda", "quantity": 2})
+    assert "TKT-4" in result
+    
+    df = manager.get_all_trades()
+    assert df["Ticket_ID"].tolist() == ["TKT-1", "TKT-2", "TKT-3", "TKT-4"]
+    assert manager.trade_count() == 4
+    assert df.loc[df["Ticket_ID"] == "TKT-1", "Account_Number"].item() == "007"
+    assert df["Solicited"].tolist() == [True, False, True, False]
+    assert manager.get_trade_summary()["total_trades"] == 4
+    
+    # The CSV mirror holds the whole history, not just the new trade
+    lines = manager.csv_file.read_text(encoding="utf-8").splitlines()
+    assert lines[0].split(",") == list(trade_data_tools._FIELDS)
+    assert [line.split(",")[0] for line in lines[1:]] == ["TKT-1", "TKT-2", "TKT-3", "TKT-4"]
+
+
+def test_bar_chart_after_pie_uses_auto_aspect(tmp_path):
+    manager = _manager(tmp_path)
+    manager.save_trade({"ticket_id": "TKT-1", "ticker": "aapl", "side": "Buy"})
+    manager.save_trade({"ticket_id": "TKT-2", "ticker": "msft", "side": "Sell"})
+    
+    assert manager.generate_trade_chart_png("buy_sell")
+    ax = trade_data_tools._FIGURES["single"].axes[0]
+    assert ax.get_aspect() == 1.0
+    
+    # The single-chart figure is recycled; the pie's equal aspect must not leak into the bars
+    assert manager.generate_trade_chart_png("top_tickers")
+    assert trade_data_tools._FIGURES["single"].axes[0] is ax
+    assert ax.get_aspect() == "auto"
+    assert ax.get_autoscale_on()
+    assert ax.get_xlim()[1] >= 1
+
+
+def test_save_trade_reports_write_failures(tmp_path):
+    manager = _manager(tmp_path)
+    # A regular file where the dataset directory should be makes the Parquet append fail
+    manager.parquet_dir.write_text("not a directory")
+    
+    result = manager.save_trade({"ticket_id": "TKT-1", "ticker": "aapl"})
+    assert result.startswith("Error saving trade")
+    assert not manager.csv_file.exists()
+
+
+def test_trades_keep_write_order_across_stages_and_time_formats(tmp_path):
+    manager = _manager(tmp_path)
+    # 12-hour legacy timestamps: "01:15 PM" sorts before "09:30 AM" as text
+    manager.csv_file.write_text(
+        "Ticket ID,Client,Ticker,Side,Qty,Timestamp,Stage\n"
+        "TKT-1,Ann,AAPL,Buy,1,2025-01-02 09:30 AM,Executed\n"
+        "TKT-2,Bob,MSFT,Sell,2,2025-01-02 01:15 PM,Pending\n"
+        "TKT-3,Cat,TSLA,Buy,3,2025-01-02 03:45 PM,Executed\n",
+        encoding="utf-8",
+    )
+    manager.save_trade({"ticket_id": "TKT-4", "ticker": "nvda", "stage": "Executed"})
+    manager.save_trade({"ticket_id": "TKT-5", "ticker": "ge", "stage": "Pending"})
+    
+    expected = ["TKT-1", "TKT-2", "TKT-3", "TKT-4", "TKT-5"]
+    assert manager._read_recent_trades(10)["Ticket_ID"].tolist() == expected
+    assert manager._read_recent_trades(3)["Ticket_ID"].tolist() == expected[-3:]
+    assert manager.get_all_trades()["Ticket_ID"].tolist() == expected
+
+
+def test_short_legacy_migration_is_rolled_back(tmp_path, monkeypatch):
+    manager = _manager(tmp_path)
+    legacy = "Ticket ID,Client,Ticker,Side,Qty,Stage\nTKT-1,Ann,AAPL,Buy,1,Executed\n"
+    manager.csv_file.write_text(legacy, encoding="utf-8")
+    monkeypatch.setattr(TradeDataManager, "trade_count", lambda self: 0)
+    
+    result = manager.save_trade({"ticket_id": "TKT-2", "ticker": "msft"})
+    assert result.startswith("Error saving trade")
+    assert not manager.parquet_dir.exists()
+    assert manager.csv_file.read_text(encoding="utf-8") == legacy